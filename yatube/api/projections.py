@@ -0,0 +1,49 @@
+from django.core.files.storage import default_storage
+
+FIELDS_SEPARATOR = ","
+
+
+def image_url(name):
+    return default_storage.url(name) if name else None
+
+
+class Projection:
+    """Public fields of a resource mapped to the columns they come from.
+
+    ``?fields=`` picks a subset of the fields, and only their columns are
+    selected with ``values()``.
+    """
+
+    def __init__(self, fields, converters=None):
+        self.fields = fields
+        self.converters = converters or {}
+
+    def parse(self, request):
+        value = request.GET.get("fields")
+        if not value:
+            return list(self.fields)
+        names = [name.strip() for name in value.split(FIELDS_SEPARATOR)]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ValueError(
+                "Неизвестные поля: " + FIELDS_SEPARATOR.join(unknown)
+            )
+        return list(dict.fromkeys(names))
+
+    def select(self, queryset, names, prefix="", extra=()):
+        """``values()`` of ``queryset`` with columns of ``names``.
+
+        ``prefix`` is the path to the projected model when the queryset
+        is over a related one; ``extra`` columns are selected as is.
+        """
+        columns = [prefix + self.fields[name] for name in names]
+        return queryset.values(*dict.fromkeys([*columns, *extra]))
+
+    def serialize(self, row, names, prefix=""):
+        data = {}
+        for name in names:
+            value = row[prefix + self.fields[name]]
+            if name in self.converters:
+                value = self.converters[name](value)
+            data[name] = value
+        return data
@@ -0,0 +1,115 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from faker import Faker
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+POSTS_FOR_TESTS = 5
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        fake = Faker()
+        cls.user = User.objects.create_user(username=fake.user_name())
+        cls.author = User.objects.create_user(username=fake.user_name())
+        cls.group = Group.objects.create(
+            title=fake.word(), slug=fake.slug(), description=fake.text()
+        )
+        for i in range(POSTS_FOR_TESTS):
+            cls.post = Post.objects.create(
+                author=cls.author, group=cls.group, text=str(i)
+            )
+        Comment.objects.create(
+            post=cls.post, author=cls.user, text=fake.text()
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def get_json(self, client, url, data=None):
+        response = client.get(url, data)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_lists_are_cursor_paginated(self):
+        """Проверка обхода списка постов по курсорам."""
+        url = reverse("api:post_list")
+        texts = []
+        data = {"limit": 2}
+        while url:
+            page = self.get_json(self.guest_client, url, data)
+            texts += [post["text"] for post in page["results"]]
+            url, data = page["next"], None
+        self.assertEqual(texts,
+                         [str(i) for i in reversed(range(POSTS_FOR_TESTS))])
+
+    def test_fields_select_only_requested_columns(self):
+        """Проверка выборки только запрошенных полей."""
+        url = reverse("api:group_posts", kwargs={"slug": self.group.slug})
+        with CaptureQueriesContext(connection) as queries:
+            page = self.get_json(
+                self.guest_client, url, {"fields": "id,author"}
+            )
+        self.assertEqual(page["results"][0],
+                         {"id": self.post.id,
+                          "author": self.author.username})
+        sql = queries.captured_queries[-1]["sql"]
+        self.assertNotIn('"text"', sql)
+        self.assertNotIn('"image"', sql)
+
+    def test_unknown_field_is_rejected(self):
+        """Проверка ответа 400 на неизвестное поле."""
+        response = self.guest_client.get(
+            reverse("api:post_list"), {"fields": "id,password"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_detail_endpoints(self):
+        """Проверка ответов для отдельных объектов."""
+        responses = {
+            reverse("api:post_detail", kwargs={"post_id": self.post.id}):
+            {"id": self.post.id, "comments_count": 1},
+            reverse("api:group_detail", kwargs={"slug": self.group.slug}):
+            {"slug": self.group.slug},
+            reverse("api:profile_detail",
+                    kwargs={"username": self.author.username}):
+            {"username": self.author.username,
+             "posts_count": POSTS_FOR_TESTS},
+        }
+        for url, expected in responses.items():
+            with self.subTest(url=url):
+                data = self.guest_client.get(url).json()
+                for key, value in expected.items():
+                    self.assertEqual(data[key], value)
+        response = self.guest_client.get(
+            reverse("api:post_detail", kwargs={"post_id": self.post.id + 1})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_comments_and_follow_feed(self):
+        """Проверка комментариев поста и ленты подписок."""
+        comments = self.get_json(
+            self.guest_client,
+            reverse("api:post_comments", kwargs={"post_id": self.post.id}),
+        )
+        self.assertEqual(comments["results"][0]["author"],
+                         self.user.username)
+        feed = self.get_json(
+            self.authorized_client, reverse("api:follow_feed")
+        )
+        self.assertEqual(len(feed["results"]), POSTS_FOR_TESTS)
+        self.assertEqual(feed["results"][0]["id"], self.post.id)
+        response = self.guest_client.get(reverse("api:follow_feed"))
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,21 @@
+from django.urls import path
+
+from . import views
+
+app_name = "api"
+
+urlpatterns = [
+    path("posts/", views.post_list, name="post_list"),
+    path("posts/<int:post_id>/", views.post_detail, name="post_detail"),
+    path("posts/<int:post_id>/comments/",
+         views.post_comments, name="post_comments"),
+    path("groups/", views.group_list, name="group_list"),
+    path("groups/<slug:slug>/", views.group_detail, name="group_detail"),
+    path("groups/<slug:slug>/posts/",
+         views.group_posts, name="group_posts"),
+    path("profiles/<str:username>/",
+         views.profile_detail, name="profile_detail"),
+    path("profiles/<str:username>/posts/",
+         views.profile_posts, name="profile_posts"),
+    path("follow/", views.follow_feed, name="follow_feed"),
+]
@@ -0,0 +1,205 @@
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from core.paginators import CursorPaginator
+from posts import timeline
+from posts.models import Comment, Group, Post, TimelineEntry
+
+from .projections import Projection, image_url
+
+User = get_user_model()
+
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+POST_FIELDS = Projection(
+    {
+        "id": "id",
+        "text": "text",
+        "created": "created",
+        "author": "author__username",
+        "group": "group__slug",
+        "image": "image",
+        "comments_count": "comments_count",
+    },
+    converters={"image": image_url},
+)
+COMMENT_FIELDS = Projection({
+    "id": "id",
+    "post": "post_id",
+    "author": "author__username",
+    "text": "text",
+    "created": "created",
+})
+GROUP_FIELDS = Projection({
+    "id": "id",
+    "slug": "slug",
+    "title": "title",
+    "description": "description",
+})
+PROFILE_FIELDS = Projection(
+    {
+        "username": "username",
+        "first_name": "first_name",
+        "last_name": "last_name",
+        "posts_count": "stats__posts_count",
+        "followers_count": "stats__followers_count",
+        "following_count": "stats__following_count",
+    },
+    converters={
+        "posts_count": lambda count: count or 0,
+        "followers_count": lambda count: count or 0,
+        "following_count": lambda count: count or 0,
+    },
+)
+
+
+def error_response(message, status):
+    return JsonResponse({"detail": message}, status=status)
+
+
+def not_found():
+    return error_response("Не найдено.", 404)
+
+
+def get_page_size(request):
+    try:
+        size = int(request.GET.get("limit", API_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("Параметр limit должен быть целым числом")
+    return min(max(size, 1), API_MAX_PAGE_SIZE)
+
+
+def page_url(request, cursor):
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query.pop("page", None)
+    query["cursor"] = cursor
+    return f"{request.path}?{query.urlencode()}"
+
+
+def stream_page(request, page, rows):
+    """Encode the page item by item instead of building one big string."""
+    encoder = DjangoJSONEncoder()
+    yield '{"results": ['
+    for index, row in enumerate(rows):
+        yield (", " if index else "") + encoder.encode(row)
+    yield '], "next": %s, "previous": %s}' % (
+        encoder.encode(page_url(request, page.next_cursor)),
+        encoder.encode(page_url(request, page.previous_cursor)),
+    )
+
+
+def list_response(request, queryset, projection, ordering="-created",
+                  prefix=""):
+    try:
+        names = projection.parse(request)
+        page_size = get_page_size(request)
+    except ValueError as error:
+        return error_response(str(error), 400)
+    rows = projection.select(
+        queryset, names, prefix, extra=("pk", ordering.lstrip("-"))
+    )
+    paginator = CursorPaginator(rows, page_size, ordering=ordering)
+    page = paginator.get_page(
+        request.GET.get("page"), request.GET.get("cursor")
+    )
+    serialized = (
+        projection.serialize(row, names, prefix) for row in page.object_list
+    )
+    return StreamingHttpResponse(
+        stream_page(request, page, serialized),
+        content_type="application/json",
+    )
+
+
+def detail_response(request, queryset, projection):
+    try:
+        names = projection.parse(request)
+    except ValueError as error:
+        return error_response(str(error), 400)
+    row = projection.select(queryset, names).first()
+    if row is None:
+        return not_found()
+    return JsonResponse(projection.serialize(row, names))
+
+
+@require_GET
+def post_list(request):
+    return list_response(request, Post.objects.all(), POST_FIELDS)
+
+
+@require_GET
+def post_detail(request, post_id):
+    return detail_response(
+        request, Post.objects.filter(id=post_id), POST_FIELDS
+    )
+
+
+@require_GET
+def post_comments(request, post_id):
+    if not Post.objects.filter(id=post_id).exists():
+        return not_found()
+    return list_response(
+        request,
+        Comment.objects.filter(post_id=post_id),
+        COMMENT_FIELDS,
+        ordering="created",
+    )
+
+
+@require_GET
+def group_list(request):
+    return list_response(
+        request, Group.objects.all(), GROUP_FIELDS, ordering="id"
+    )
+
+
+@require_GET
+def group_detail(request, slug):
+    return detail_response(
+        request, Group.objects.filter(slug=slug), GROUP_FIELDS
+    )
+
+
+@require_GET
+def group_posts(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        "id", flat=True
+    ).first()
+    if group_id is None:
+        return not_found()
+    return list_response(
+        request, Post.objects.filter(group_id=group_id), POST_FIELDS
+    )
+
+
+@require_GET
+def profile_detail(request, username):
+    return detail_response(
+        request, User.objects.filter(username=username), PROFILE_FIELDS
+    )
+
+
+@require_GET
+def profile_posts(request, username):
+    author_id = User.objects.filter(username=username).values_list(
+        "id", flat=True
+    ).first()
+    if author_id is None:
+        return not_found()
+    return list_response(
+        request, Post.objects.filter(author_id=author_id), POST_FIELDS
+    )
+
+
+@require_GET
+def follow_feed(request):
+    if not request.user.is_authenticated:
+        return error_response("Требуется авторизация.", 401)
+    posts = timeline.timeline_posts(request.user)
+    prefix = "post__" if posts.model is TimelineEntry else ""
+    return list_response(request, posts, POST_FIELDS, prefix=prefix)
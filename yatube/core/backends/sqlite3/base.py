@@ -0,0 +1,168 @@
+"""SQLite backend tuned for several worker processes and threads.
+
+Every connection switches to WAL, so readers never wait for the writer,
+and relaxes fsync to ``synchronous=NORMAL``, which is safe in WAL mode.
+Inside one process writers queue on a lock instead of spinning in
+SQLite's busy handler. ``atomic()`` blocks take the lock and run under
+``BEGIN IMMEDIATE`` from their first statement, so a block that reads
+before it writes never has to upgrade a read lock, which fails with
+"database is locked" when another process wrote in between. Blocks that
+only read use ``read_only_atomic()`` and never hold up writers.
+
+``OPTIONS["pragmas"]`` overrides the defaults in ``PRAGMAS``.
+"""
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.backends.sqlite3 import base
+from django.db.backends.sqlite3.base import Database
+
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
+    # Negative sizes are in KiB.
+    "cache_size": -16 * 1024,
+    "temp_store": "MEMORY",
+}
+READ_STATEMENTS = ("SELECT", "PRAGMA", "EXPLAIN", "BEGIN", "SAVEPOINT",
+                   "RELEASE")
+
+write_locks = defaultdict(threading.RLock)
+
+
+@contextmanager
+def read_only_atomic(using=None):
+    """``atomic()`` for blocks that only read.
+
+    On this backend the transaction starts with a deferred ``BEGIN`` and
+    does not hold up writers; a write inside it may fail with "database
+    is locked". Other backends get a plain ``atomic()``.
+    """
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    outermost = not connection.in_atomic_block
+    with transaction.atomic(using=using):
+        if outermost and isinstance(connection, DatabaseWrapper):
+            connection.read_only_transaction = True
+        try:
+            yield
+        finally:
+            if outermost:
+                connection.read_only_transaction = False
+
+
+class WriteSerializingCursor(base.SQLiteCursorWrapper):
+    """Take the write lock for statements that write."""
+
+    def execute(self, query, params=None):
+        with self.wrapper.statement_lock(query):
+            return super().execute(query, params)
+
+    def executemany(self, query, param_list):
+        with self.wrapper.statement_lock(query):
+            return super().executemany(query, param_list)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.write_lock = write_locks[self.settings_dict["NAME"]]
+        self.write_lock_depth = 0
+        self.transaction_pending = False
+        self.read_only_transaction = False
+        self.pragmas = PRAGMAS
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = {**PRAGMAS, **params.pop("pragmas", {})}
+        # The busy handler is set by the pragma.
+        params.pop("timeout", None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            connection.execute(f"PRAGMA {name} = {value}")
+        return connection
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=WriteSerializingCursor)
+        cursor.wrapper = self
+        return cursor
+
+    @contextmanager
+    def statement_lock(self, query):
+        """Hold the write lock while ``query`` runs if it writes; inside a
+        transaction keep it until the transaction ends."""
+        write = not query.lstrip()[:9].upper().startswith(READ_STATEMENTS)
+        if self.transaction_pending:
+            self.begin_transaction(write or not self.read_only_transaction)
+        elif write and not self.write_lock_depth:
+            if not self.connection.in_transaction:
+                with self.write_lock_held():
+                    yield
+                return
+            # A read-only transaction writes after all.
+            self.acquire_write_lock()
+        yield
+
+    @contextmanager
+    def write_lock_held(self):
+        self.acquire_write_lock()
+        try:
+            yield
+        finally:
+            self.release_write_lock()
+
+    def acquire_write_lock(self):
+        timeout = self.pragmas["busy_timeout"] / 1000
+        if not self.write_lock.acquire(timeout=timeout):
+            raise Database.OperationalError("database is locked")
+        self.write_lock_depth += 1
+
+    def release_write_lock(self):
+        if self.write_lock_depth:
+            self.write_lock_depth -= 1
+            self.write_lock.release()
+
+    def release_transaction_lock(self):
+        self.transaction_pending = False
+        while self.write_lock_depth:
+            self.release_write_lock()
+
+    def _start_transaction_under_autocommit(self):
+        # The first statement decides how the transaction begins.
+        self.transaction_pending = True
+
+    def begin_transaction(self, immediate):
+        self.transaction_pending = False
+        if not immediate:
+            self.connection.execute("BEGIN")
+            return
+        self.acquire_write_lock()
+        try:
+            self.connection.execute("BEGIN IMMEDIATE")
+        except Exception:
+            self.release_write_lock()
+            raise
+
+    def _commit(self):
+        try:
+            super()._commit()
+        finally:
+            self.release_transaction_lock()
+
+    def _rollback(self):
+        try:
+            super()._rollback()
+        finally:
+            self.release_transaction_lock()
+
+    def _close(self):
+        try:
+            super()._close()
+        finally:
+            self.release_transaction_lock()
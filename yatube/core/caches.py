@@ -0,0 +1,26 @@
+"""Cache timeouts that depend on whether the cache is shared.
+
+Invalidation (generation and version bumps, deleted keys) only reaches the
+processes that share the cache. With a per-process cache such as the
+default ``LocMemCache`` other workers never see it, so whatever they
+cache is kept no longer than ``LOCAL_CACHE_MAX_TIMEOUT``.
+"""
+from django.conf import settings
+
+LOCAL_CACHE_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+LOCAL_CACHE_MAX_TIMEOUT = 20
+
+
+def is_shared(alias="default"):
+    return settings.CACHES[alias]["BACKEND"] not in LOCAL_CACHE_BACKENDS
+
+
+def shared_timeout(timeout, alias="default"):
+    """``timeout`` if the cache is shared by all processes, otherwise at
+    most ``LOCAL_CACHE_MAX_TIMEOUT``."""
+    if is_shared(alias):
+        return timeout
+    return min(timeout, LOCAL_CACHE_MAX_TIMEOUT)
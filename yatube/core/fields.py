@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class FullTextField(models.TextField):
+    """Column of an SQLite FTS5 table, supports the ``match`` lookup."""
+
+
+@FullTextField.register_lookup
+class Match(models.Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sorl.thumbnail.conf import settings
+from sorl.thumbnail.kvstores.cached_db_kvstore import EMPTY_VALUE, KVStore
+from sorl.thumbnail.models import KVStore as KVStoreModel
+
+from . import metrics
+
+LRU_MAX_SIZE = 10000
+LRU_TIMEOUT = 5 * 60
+
+MISSING = object()
+
+
+class LRUKVStore(KVStore):
+    """sorl-thumbnail key-value store with an in-process LRU in front.
+
+    Entries, including "not found" answers, expire after ``LRU_TIMEOUT`` so
+    changes made by other processes are picked up eventually; changes made
+    through this store are applied to the LRU immediately. "Not found"
+    answers are kept in the shared cache no longer than in the LRU either,
+    unlike sorl's store, which keeps them for ``THUMBNAIL_CACHE_TIMEOUT``.
+    """
+
+    def __init__(self, max_size=LRU_MAX_SIZE, timeout=LRU_TIMEOUT):
+        super().__init__()
+        self.max_size = max_size
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+        }
+
+    def forget(self, *keys):
+        """Drop raw keys from the LRU and the shared cache, not the DB."""
+        self._evict(keys)
+        for key in keys:
+            self.cache.delete(key)
+
+    def _get_raw(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            hit = entry is not None and entry[1] > now
+            if hit:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if hit:
+            metrics.inc("yatube_thumbnail_kvstore_lru_hits_total")
+            return None if entry[0] is MISSING else entry[0]
+        metrics.inc("yatube_thumbnail_kvstore_lru_misses_total")
+        value = self._get_shared(key)
+        self._remember(key, MISSING if value is None else value)
+        return value
+
+    def _get_shared(self, key):
+        value = self.cache.get(key)
+        if value is None:
+            try:
+                value = KVStoreModel.objects.get(key=key).value
+            except KVStoreModel.DoesNotExist:
+                # Another process may generate the thumbnail any moment.
+                self.cache.set(key, EMPTY_VALUE, self.timeout)
+                return None
+            self.cache.set(key, value, settings.THUMBNAIL_CACHE_TIMEOUT)
+        return None if value == EMPTY_VALUE else value
+
+    def _set_raw(self, key, value):
+        super()._set_raw(key, value)
+        self._remember(key, value)
+
+    def _delete_raw(self, *keys):
+        super()._delete_raw(*keys)
+        self._evict(keys)
+
+    def clear(self, delete_thumbnails=False):
+        super().clear(delete_thumbnails)
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.timeout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _evict(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
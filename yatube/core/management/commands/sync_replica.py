@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.replicas import get_replicas, sync_sqlite
+
+
+class Command(BaseCommand):
+    help = (
+        "Копирует основную базу SQLite в файлы реплик "
+        "из settings.DATABASE_REPLICAS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "replicas",
+            nargs="*",
+            help="Псевдонимы реплик; по умолчанию — все.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Повторять копирование с этим интервалом в секундах.",
+        )
+
+    def handle(self, *args, **options):
+        replicas = options["replicas"] or get_replicas()
+        unknown = set(replicas) - set(get_replicas())
+        if unknown:
+            raise CommandError(
+                f"Неизвестные реплики: {', '.join(sorted(unknown))}"
+            )
+        if connections[DEFAULT_DB_ALIAS].vendor != "sqlite":
+            raise CommandError(
+                "Копируются только базы SQLite; другие реплики "
+                "синхронизирует сервер базы данных"
+            )
+        while True:
+            for alias in replicas:
+                started = time.monotonic()
+                sync_sqlite(settings.DATABASES[alias]["NAME"])
+                self.stdout.write(
+                    f"{alias}: {time.monotonic() - started:.2f} с"
+                )
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,246 @@
+"""Process-local metrics shared between workers through snapshot files.
+
+Every process keeps its counters and histograms in memory and, when
+``settings.METRICS_DIR`` is set, writes them to ``<METRICS_DIR>/<pid>.json``
+at most every ``METRICS_FLUSH_INTERVAL`` seconds. ``/metrics`` sums the
+snapshots of all processes, much like prometheus_client's multiprocess mode.
+Snapshots of processes that are gone are deleted instead of being summed.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+
+METRICS_FLUSH_INTERVAL = 5
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+METRICS = {
+    "yatube_requests_total": (
+        "counter", "Запросы по имени адреса, методу и статусу."
+    ),
+    "yatube_request_duration_seconds": (
+        "histogram", "Время обработки запроса."
+    ),
+    "yatube_db_queries_total": (
+        "counter", "Запросы к базе данных по имени адреса."
+    ),
+    "yatube_db_query_duration_seconds_total": (
+        "counter", "Время запросов к базе данных по имени адреса."
+    ),
+    "yatube_template_render_duration_seconds": (
+        "histogram", "Время отрисовки шаблонов."
+    ),
+    "yatube_thumbnail_kvstore_lru_hits_total": (
+        "counter", "Попадания в LRU хранилища миниатюр."
+    ),
+    "yatube_thumbnail_kvstore_lru_misses_total": (
+        "counter", "Промахи LRU хранилища миниатюр."
+    ),
+    "yatube_rate_limited_total": (
+        "counter", "Запросы, отклонённые ограничением частоты."
+    ),
+    "yatube_db_replica_lag_seconds": (
+        "gauge", "Отставание реплики базы данных от основной."
+    ),
+}
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.gauges = {}
+        self.histograms = {}
+        self.flushed = time.monotonic()
+
+    def inc(self, name, labels=(), value=1):
+        with self.lock:
+            self.counters[name, tuple(labels)] += value
+        self.maybe_flush()
+
+    def set(self, name, labels, value):
+        with self.lock:
+            self.gauges[name, tuple(labels)] = [value, time.time()]
+        self.maybe_flush()
+
+    def observe(self, name, labels, value, buckets=DEFAULT_BUCKETS):
+        key = (name, tuple(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {
+                    "buckets": list(buckets),
+                    "counts": [0] * (len(buckets) + 1),
+                    "sum": 0.0,
+                }
+            histogram["counts"][bisect_left(buckets, value)] += 1
+            histogram["sum"] += value
+        self.maybe_flush()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "counters": [
+                    [name, labels, value]
+                    for (name, labels), value in self.counters.items()
+                ],
+                "gauges": [
+                    [name, labels, list(value)]
+                    for (name, labels), value in self.gauges.items()
+                ],
+                "histograms": [
+                    [name, labels, dict(histogram,
+                                        counts=list(histogram["counts"]))]
+                    for (name, labels), histogram in self.histograms.items()
+                ],
+            }
+
+    def maybe_flush(self):
+        if time.monotonic() - self.flushed >= METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        self.flushed = time.monotonic()
+        directory = getattr(settings, "METRICS_DIR", None)
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as snapshot_file:
+            json.dump(self.snapshot(), snapshot_file)
+        os.replace(temporary, path)
+
+
+registry = Registry()
+
+
+def inc(name, labels=(), value=1):
+    registry.inc(name, labels, value)
+
+
+def set_gauge(name, labels, value):
+    registry.set(name, labels, value)
+
+
+def observe(name, labels, value, buckets=DEFAULT_BUCKETS):
+    registry.observe(name, labels, value, buckets)
+
+
+def is_alive(pid):
+    if not pid.isdigit() or int(pid) == 0:
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists but belongs to another user.
+        return True
+    return True
+
+
+def load_snapshots():
+    directory = getattr(settings, "METRICS_DIR", None)
+    if not directory:
+        return [registry.snapshot()]
+    registry.flush()
+    snapshots = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(directory, name)
+        if not is_alive(name[:-len(".json")]):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path) as snapshot_file:
+                snapshots.append(json.load(snapshot_file))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def merge(snapshots):
+    """Sum counters and histograms; gauges keep the latest value."""
+    counters = defaultdict(float)
+    gauges = {}
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot["counters"]:
+            counters[name, tuple(map(tuple, labels))] += value
+        for name, labels, (value, updated) in snapshot.get("gauges", ()):
+            key = (name, tuple(map(tuple, labels)))
+            if key not in gauges or gauges[key][1] < updated:
+                gauges[key] = (value, updated)
+        for name, labels, histogram in snapshot["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, {
+                "buckets": histogram["buckets"],
+                "counts": [0] * len(histogram["counts"]),
+                "sum": 0.0,
+            })
+            if merged["buckets"] != histogram["buckets"]:
+                continue
+            for index, count in enumerate(histogram["counts"]):
+                merged["counts"][index] += count
+            merged["sum"] += histogram["sum"]
+    counters.update(
+        (key, value) for key, (value, updated) in gauges.items()
+    )
+    return counters, histograms
+
+
+def escape(value):
+    return (
+        str(value).replace("\\", "\\\\").replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{escape(value)}"' for key, value in labels)
+    return "{" + pairs + "}"
+
+
+def format_number(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render():
+    """All processes' metrics in the Prometheus text exposition format."""
+    counters, histograms = merge(load_snapshots())
+    lines = []
+    for name, (metric_type, description) in METRICS.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(
+                    f"{name}{format_labels(labels)} {format_number(value)}"
+                )
+        for (metric, labels), histogram in sorted(histograms.items()):
+            if metric != name:
+                continue
+            total = 0
+            bounds = [*histogram["buckets"], "+Inf"]
+            for bound, count in zip(bounds, histogram["counts"]):
+                total += count
+                bucket_labels = format_labels([*labels, ("le", bound)])
+                lines.append(f"{name}_bucket{bucket_labels} {total}")
+            lines.append(
+                f"{name}_sum{format_labels(labels)} "
+                f"{format_number(histogram['sum'])}"
+            )
+            lines.append(f"{name}_count{format_labels(labels)} {total}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,139 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.shortcuts import render
+
+from . import metrics
+from .ratelimit import get_client_key, hit, parse_rate
+from .replicas import REPLICA_PIN_COOKIE, get_replicas, reading_from_replicas
+from .slow_queries import get_threshold, log_slow_queries
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class QueryStats:
+    """``execute_wrapper`` that counts and times database queries."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """Record latency and database usage of every request by URL name."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryStats()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match else "<unresolved>"
+        labels = (("view", view), ("method", request.method))
+        metrics.inc("yatube_requests_total",
+                    labels + (("status", response.status_code),))
+        metrics.observe("yatube_request_duration_seconds", labels, duration)
+        metrics.inc("yatube_db_queries_total", labels[:1], queries.count)
+        metrics.inc("yatube_db_query_duration_seconds_total", labels[:1],
+                    queries.duration)
+        return response
+
+
+class SlowQueryMiddleware:
+    """Log slow queries with the name of the view that made them.
+
+    Opt-in: enabled by ``settings.SLOW_QUERY_THRESHOLD_MS``.
+    """
+
+    def __init__(self, get_response):
+        if get_threshold() is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        def view():
+            match = request.resolver_match
+            return match.view_name if match else request.path
+
+        with log_slow_queries(view):
+            return self.get_response(request)
+
+
+class ReplicaMiddleware:
+    """Read from replicas on safe requests of clients that did not write
+    within the last ``settings.REPLICA_PIN_SECONDS``.
+
+    Opt-in: enabled by ``settings.DATABASE_REPLICAS``.
+    """
+
+    def __init__(self, get_response):
+        if not get_replicas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        enabled = (
+            request.method in SAFE_METHODS
+            and REPLICA_PIN_COOKIE not in request.COOKIES
+        )
+        with reading_from_replicas(enabled) as current:
+            response = self.get_response(request)
+        if current.wrote:
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, "1",
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True,
+            )
+        return response
+
+
+class RateLimitMiddleware:
+    """Answer ``429`` to clients over ``settings.RATE_LIMITS``; only
+    requests that change something are counted, which includes safe
+    methods of views decorated with ``limit_safe_methods``."""
+
+    def __init__(self, get_response):
+        self.limits = {
+            name: parse_rate(rate)
+            for name, rate in getattr(settings, "RATE_LIMITS", {}).items()
+        }
+        if not self.limits:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        name = request.resolver_match.view_name
+        if name not in self.limits or (
+            request.method in SAFE_METHODS
+            and not getattr(view_func, "rate_limit_safe_methods", False)
+        ):
+            return None
+        retry_after = hit(name, get_client_key(request), *self.limits[name])
+        if retry_after is None:
+            return None
+        metrics.inc("yatube_rate_limited_total", (("view", name),))
+        response = render(
+            request, "core/429.html", {"retry_after": retry_after},
+            status=429,
+        )
+        response["Retry-After"] = str(retry_after)
+        return response
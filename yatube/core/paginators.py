@@ -0,0 +1,278 @@
+import base64
+import binascii
+import json
+
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .caches import shared_timeout
+
+NEXT = "n"
+PREVIOUS = "p"
+ELLIPSIS = "…"
+PAGE_WINDOW_ON_EACH_SIDE = 2
+PAGE_WINDOW_ON_ENDS = 1
+COUNT_CACHE_PREFIX = "paginators:count"
+# Bounds the drift of counts kept up to date by ``change_cached_count``.
+COUNT_CACHE_TIMEOUT = 60 * 60
+# Tables estimated to be smaller than this are counted exactly anyway.
+APPROXIMATE_COUNT_THRESHOLD = 100000
+
+
+def count_cache_key(name):
+    return f"{COUNT_CACHE_PREFIX}:{name}"
+
+
+def change_cached_count(name, delta):
+    """Apply a write to the cached count ``name``, if it is cached."""
+    try:
+        cache.incr(count_cache_key(name), delta)
+    except ValueError:
+        pass
+
+
+def forget_cached_counts(names):
+    cache.delete_many([count_cache_key(name) for name in names])
+
+
+def estimate_rows(queryset):
+    """Planner statistics estimate of the rows of an unfiltered queryset.
+
+    Returns ``None`` when the queryset is filtered or the database has no
+    statistics for the table yet (SQLite keeps them after ``ANALYZE``).
+    """
+    if queryset.query.where:
+        return None
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                # Fails with "no such table" until the first ANALYZE.
+                cursor.execute(
+                    "SELECT stat FROM sqlite_stat1 WHERE tbl = %s", [table]
+                )
+                rows = [int(stat.split()[0]) for stat, in cursor.fetchall()]
+                return max(rows) if rows else None
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                    [table],
+                )
+                row = cursor.fetchone()
+                return int(row[0]) if row and row[0] > 0 else None
+    except DatabaseError:
+        return None
+    return None
+
+
+class CursorPage(Page):
+    """Page of a keyset paginated queryset.
+
+    Knows its neighbours only through opaque cursors, so rendering it never
+    requires the total number of objects.
+    """
+
+    def __init__(self, object_list, number, paginator,
+                 next_cursor=None, previous_cursor=None):
+        super().__init__(object_list, number, paginator)
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def page_window(self):
+        return self.paginator.page_window(self.number)
+
+
+class CursorPaginator(Paginator):
+    """Keyset paginator over ``(<ordering field>, pk)``.
+
+    ``?cursor=`` tokens point right after (or right before) the boundary row
+    of the neighbouring page, so any page costs one indexed range scan of
+    ``per_page + 1`` rows and no ``COUNT(*)``. Plain ``?page=N`` numbers are
+    still accepted for old links; they are served with ``OFFSET`` but without
+    counting either.
+    """
+
+    ELLIPSIS = ELLIPSIS
+
+    def __init__(self, object_list, per_page, ordering="-created", **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.field = ordering.lstrip("-")
+        self.descending = ordering.startswith("-")
+
+    def _check_object_list_is_ordered(self):
+        # Every page query orders the list by the cursor fields.
+        pass
+
+    def page_window(self, number):
+        """Page numbers to link to; empty while the total is unknown."""
+        return []
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise InvalidPage("Номер страницы не является целым числом")
+        if number < 1:
+            raise InvalidPage("Номер страницы меньше 1")
+        return number
+
+    def get_page(self, number=None, cursor=None):
+        if cursor:
+            try:
+                return self.cursor_page(cursor)
+            except InvalidPage:
+                pass
+        try:
+            return self.page(number)
+        except InvalidPage:
+            return self.page(1)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        offset = (number - 1) * self.per_page
+        rows = list(self._ordered()[offset:offset + self.per_page + 1])
+        if not rows and number > 1:
+            raise InvalidPage("На этой странице нет результатов")
+        return self._make_page(
+            rows[:self.per_page],
+            number,
+            has_next=len(rows) > self.per_page,
+            has_previous=number > 1,
+        )
+
+    def cursor_page(self, cursor):
+        direction, value, pk, number = self.decode_cursor(cursor)
+        reverse = direction == PREVIOUS
+        rows = list(
+            self._ordered(reverse)
+            .filter(self._beyond(value, pk, reverse))[:self.per_page + 1]
+        )
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            # Previous pages are fetched in the opposite order.
+            return self._make_page(
+                rows[::-1],
+                number if has_more else 1,
+                has_next=True,
+                has_previous=has_more,
+            )
+        return self._make_page(
+            rows, number, has_next=has_more, has_previous=True
+        )
+
+    def _make_page(self, rows, number, has_next, has_previous):
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.encode_cursor(NEXT, rows[-1], number + 1)
+        if rows and has_previous:
+            previous_cursor = self.encode_cursor(
+                PREVIOUS, rows[0], max(number - 1, 1)
+            )
+        return CursorPage(rows, number, self, next_cursor, previous_cursor)
+
+    def _ordered(self, reverse=False):
+        prefix = "-" if self.descending != reverse else ""
+        return self.object_list.order_by(
+            prefix + self.field, prefix + "pk"
+        )
+
+    def _beyond(self, value, pk, reverse=False):
+        lookup = "lt" if self.descending != reverse else "gt"
+        return Q(**{f"{self.field}__{lookup}": value}) | Q(
+            **{self.field: value, f"pk__{lookup}": pk}
+        )
+
+    def encode_cursor(self, direction, obj, number):
+        if isinstance(obj, dict):
+            # Rows of ``values()`` querysets must include the field and pk.
+            value, pk = obj[self.field], obj["pk"]
+        else:
+            value, pk = getattr(obj, self.field), obj.pk
+        if hasattr(value, "isoformat"):
+            value = value.isoformat()
+        payload = json.dumps([direction, value, pk, number])
+        token = base64.urlsafe_b64encode(payload.encode()).decode()
+        return token.rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = base64.urlsafe_b64decode(padded.encode())
+            direction, value, pk, number = json.loads(payload.decode())
+        except (binascii.Error, UnicodeError, ValueError, TypeError):
+            raise InvalidPage("Некорректный курсор")
+        if direction not in (NEXT, PREVIOUS) or not isinstance(pk, int):
+            raise InvalidPage("Некорректный курсор")
+        if isinstance(value, str):
+            value = parse_datetime(value) or value
+        return direction, value, pk, self.validate_number(number)
+
+
+class CountedCursorPaginator(CursorPaginator):
+    """CursorPaginator that also knows the number of pages.
+
+    The total is either passed as ``count`` (from a maintained counter) or
+    read from the cache under ``count_name``, where writes keep it current
+    through ``change_cached_count``. On a miss it is counted once, or, with
+    ``approximate=True``, estimated from planner statistics for big tables.
+    """
+
+    def __init__(self, object_list, per_page, ordering="-created",
+                 count=None, count_name=None, approximate=False, **kwargs):
+        super().__init__(object_list, per_page, ordering, **kwargs)
+        self.known_count = count
+        self.count_name = count_name
+        self.approximate = approximate
+
+    @cached_property
+    def count(self):
+        if self.known_count is not None:
+            return self.known_count
+        key = count_cache_key(self.count_name)
+        count = cache.get(key)
+        if count is None:
+            if self.approximate:
+                count = estimate_rows(self.object_list)
+                if count is not None and count < APPROXIMATE_COUNT_THRESHOLD:
+                    count = None
+            if count is None:
+                count = self.object_list.count()
+            cache.add(key, count, shared_timeout(COUNT_CACHE_TIMEOUT))
+        return count
+
+    def page_window(self, number, on_each_side=PAGE_WINDOW_ON_EACH_SIDE,
+                    on_ends=PAGE_WINDOW_ON_ENDS):
+        """Numbers around ``number`` and at both ends, gaps as ELLIPSIS.
+
+        The window has at most ``2 * (on_each_side + on_ends) + 3`` items
+        however many pages there are.
+        """
+        last = self.num_pages
+        if last <= 1:
+            return []
+        numbers = sorted({
+            *range(1, min(on_ends, last) + 1),
+            *range(max(number - on_each_side, 1),
+                   min(number + on_each_side, last) + 1),
+            *range(max(last - on_ends + 1, 1), last + 1),
+        })
+        window = []
+        for previous, current in zip([0, *numbers], numbers):
+            if current - previous == 2:
+                window.append(previous + 1)
+            elif current - previous > 2:
+                window.append(ELLIPSIS)
+            window.append(current)
+        return window
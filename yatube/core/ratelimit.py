@@ -0,0 +1,67 @@
+"""Per-client request limits by URL name, kept in the cache.
+
+``settings.RATE_LIMITS`` maps URL names to rates like ``"30/m"``. Every
+client, a user or, for anonymous requests, an IP address, gets a bucket
+of that many requests refilled at the start of each period. The bucket
+is one cache counter per period, so a request costs one ``incr``. Behind
+a proxy the address comes from ``settings.RATE_LIMIT_CLIENT_IP_HEADER``.
+With a per-process cache every worker counts on its own, so a client
+gets up to the limit times the number of workers.
+"""
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+RATE_LIMIT_PREFIX = "ratelimit"
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+
+def parse_rate(rate):
+    """``"30/m"`` → ``(30, 60)``."""
+    count, period = rate.split("/")
+    return int(count), PERIODS[period]
+
+
+def limit_safe_methods(view):
+    """Count GET requests to ``view`` too, for views that change state
+    through a link."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        return view(*args, **kwargs)
+    wrapper.rate_limit_safe_methods = True
+    return wrapper
+
+
+def get_client_ip(request):
+    header = getattr(settings, "RATE_LIMIT_CLIENT_IP_HEADER", None)
+    value = request.META.get(header, "") if header else ""
+    # Proxies append to X-Forwarded-For, so the last address is the one
+    # our proxy saw; earlier ones are whatever the client sent.
+    address = value.split(",")[-1].strip()
+    return address or request.META.get("REMOTE_ADDR")
+
+
+def get_client_key(request):
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    return f"ip:{get_client_ip(request)}"
+
+
+def hit(name, client, limit, period):
+    """Count a request; return seconds to wait if it is over the limit."""
+    now = time.time()
+    window = int(now // period)
+    key = f"{RATE_LIMIT_PREFIX}:{name}:{client}:{window}"
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # The first request of the period creates the counter.
+        if cache.add(key, 1, period + 1):
+            count = 1
+        else:
+            count = cache.incr(key)
+    if count <= limit:
+        return None
+    return max(int((window + 1) * period - now), 1)
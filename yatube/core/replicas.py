@@ -0,0 +1,129 @@
+"""Read replicas for safe requests.
+
+``ReplicaMiddleware`` marks safe requests as allowed to read from
+``settings.DATABASE_REPLICAS``; ``ReplicaRouter`` then sends their reads to
+one replica chosen per request. A request that writes is served by the
+primary from then on and pins its client to the primary for
+``settings.REPLICA_PIN_SECONDS``, so the client reads its own writes.
+"""
+import random
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from . import metrics
+
+REPLICA_PIN_COOKIE = "primary_pin"
+HEARTBEAT_TABLE = "replica_heartbeat"
+# Reads of these models always go to the primary: a session missing from
+# a lagging replica would log the user out.
+PRIMARY_MODELS = {"sessions.session"}
+
+state = threading.local()
+
+
+def get_replicas():
+    return list(getattr(settings, "DATABASE_REPLICAS", ()))
+
+
+@contextmanager
+def reading_from_replicas(enabled=True):
+    """Let reads inside the block go to a replica.
+
+    Yields the request state; its ``wrote`` is set once anything is written.
+    """
+    replicas = get_replicas()
+    previous = getattr(state, "current", None)
+    current = state.current = SimpleNamespace(
+        replica=random.choice(replicas) if enabled and replicas else None,
+        wrote=False,
+    )
+    try:
+        yield current
+    finally:
+        state.current = previous
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        current = getattr(state, "current", None)
+        if (
+            current is None
+            or current.replica is None
+            or current.wrote
+            or model._meta.label_lower in PRIMARY_MODELS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return current.replica
+
+    def db_for_write(self, model, **hints):
+        current = getattr(state, "current", None)
+        if current is not None:
+            current.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def sync_sqlite(path):
+    """Copy the primary SQLite database to ``path`` and stamp the copy.
+
+    The stamp is the moment the copy started, so the replica lag is never
+    underestimated.
+    """
+    source = connections[DEFAULT_DB_ALIAS]
+    source.ensure_connection()
+    synced = time.time()
+    with closing(sqlite3.connect(path)) as target:
+        source.connection.backup(target)
+        target.execute(
+            f"CREATE TABLE IF NOT EXISTS {HEARTBEAT_TABLE} (synced REAL)"
+        )
+        target.execute(f"DELETE FROM {HEARTBEAT_TABLE}")
+        target.execute(
+            f"INSERT INTO {HEARTBEAT_TABLE} (synced) VALUES (?)", [synced]
+        )
+        target.commit()
+    return synced
+
+
+def get_lag(alias):
+    """Seconds the replica ``alias`` is behind, or ``None`` if unknown."""
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute(f"SELECT synced FROM {HEARTBEAT_TABLE}")
+                row = cursor.fetchone()
+                return time.time() - row[0] if row else None
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT EXTRACT(EPOCH FROM now() - "
+                    "pg_last_xact_replay_timestamp())"
+                )
+                row = cursor.fetchone()
+                return float(row[0]) if row and row[0] is not None else None
+    except DatabaseError:
+        return None
+    return None
+
+
+def record_lag():
+    for alias in get_replicas():
+        lag = get_lag(alias)
+        if lag is not None:
+            metrics.set_gauge(
+                "yatube_db_replica_lag_seconds", (("database", alias),),
+                max(lag, 0.0),
+            )
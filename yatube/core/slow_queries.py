@@ -0,0 +1,125 @@
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger("yatube.slow_queries")
+
+# The same statement is logged at most once per this many seconds.
+SLOW_QUERY_REPEAT_INTERVAL = 60
+# And no more than this many statements are logged per minute overall.
+SLOW_QUERY_LOG_RATE = 30
+
+
+class RateLimiter:
+    def __init__(self, repeat_interval=SLOW_QUERY_REPEAT_INTERVAL,
+                 per_minute=SLOW_QUERY_LOG_RATE):
+        self.repeat_interval = repeat_interval
+        self.per_minute = per_minute
+        self.lock = threading.Lock()
+        self.last_logged = {}
+        self.window_start = 0
+        self.window_count = 0
+
+    def allow(self, sql):
+        now = time.monotonic()
+        with self.lock:
+            if now - self.last_logged.get(sql, -self.repeat_interval) < (
+                self.repeat_interval
+            ):
+                return False
+            if now - self.window_start >= 60:
+                self.window_start, self.window_count = now, 0
+                # Forget statements that can be logged again anyway.
+                self.last_logged = {
+                    key: logged for key, logged in self.last_logged.items()
+                    if now - logged < self.repeat_interval
+                }
+            if self.window_count >= self.per_minute:
+                return False
+            self.window_count += 1
+            self.last_logged[sql] = now
+            return True
+
+
+rate_limiter = RateLimiter()
+
+
+class SlowQueryLogger:
+    """``execute_wrapper`` logging statements slower than ``threshold``.
+
+    Slow ``SELECT`` statements are logged with their query plan.
+    """
+
+    def __init__(self, connection, threshold, view=None):
+        self.connection = connection
+        self.threshold = threshold
+        self.view = view
+        self.explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.explaining:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            if duration >= self.threshold and rate_limiter.allow(sql):
+                self.log(sql, params, many, duration)
+
+    def log(self, sql, params, many, duration):
+        view = self.view() if callable(self.view) else self.view
+        logger.warning(json.dumps({
+            "duration_ms": round(duration * 1000, 3),
+            "view": view,
+            "database": self.connection.alias,
+            "sql": sql,
+            "params": None if many else [str(param) for param in params or ()],
+            "plan": None if many else self.explain(sql, params),
+        }, ensure_ascii=False))
+
+    def explain(self, sql, params):
+        if sql.lstrip()[:6].upper() != "SELECT":
+            return None
+        prefix = (
+            "EXPLAIN QUERY PLAN " if self.connection.vendor == "sqlite"
+            else "EXPLAIN "
+        )
+        self.explaining = True
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(prefix + sql, params)
+                return [
+                    " ".join(str(column) for column in row)
+                    for row in cursor.fetchall()
+                ]
+        except Exception as error:
+            return [f"EXPLAIN не удался: {error}"]
+        finally:
+            self.explaining = False
+
+
+def get_threshold():
+    threshold = getattr(settings, "SLOW_QUERY_THRESHOLD_MS", None)
+    return None if threshold is None else threshold / 1000
+
+
+@contextmanager
+def log_slow_queries(view=None):
+    """Log slow queries of every connection inside the block.
+
+    Does nothing unless ``settings.SLOW_QUERY_THRESHOLD_MS`` is set.
+    """
+    threshold = get_threshold()
+    with ExitStack() as stack:
+        if threshold is not None:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(
+                    SlowQueryLogger(connection, threshold, view)
+                ))
+        yield
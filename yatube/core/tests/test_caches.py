@@ -0,0 +1,19 @@
+from django.test import SimpleTestCase, override_settings
+
+from ..caches import LOCAL_CACHE_MAX_TIMEOUT, shared_timeout
+
+SHARED_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache"},
+}
+
+
+class SharedTimeoutTests(SimpleTestCase):
+    def test_local_cache_keeps_entries_briefly(self):
+        """Проверка сокращения времени жизни записей в кэше процесса."""
+        self.assertEqual(shared_timeout(60 * 60), LOCAL_CACHE_MAX_TIMEOUT)
+        self.assertEqual(shared_timeout(5), 5)
+
+    @override_settings(CACHES=SHARED_CACHES)
+    def test_shared_cache_keeps_timeout(self):
+        """Проверка полного времени жизни записей в общем кэше."""
+        self.assertEqual(shared_timeout(60 * 60), 60 * 60)
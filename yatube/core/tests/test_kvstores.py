@@ -0,0 +1,48 @@
+from unittest import mock
+
+from sorl.thumbnail.kvstores.cached_db_kvstore import EMPTY_VALUE
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..kvstores import LRUKVStore
+
+
+class LRUKVStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.store = LRUKVStore(max_size=2)
+
+    def test_repeated_reads_are_served_from_lru(self):
+        """Проверка чтения повторных запросов из LRU."""
+        self.store._set_raw("first", "value")
+        with mock.patch.object(
+            LRUKVStore, "_get_shared", return_value=None
+        ) as shared_get:
+            self.assertEqual(self.store._get_raw("first"), "value")
+            self.assertIsNone(self.store._get_raw("missing"))
+            self.assertIsNone(self.store._get_raw("missing"))
+        self.assertEqual(shared_get.call_count, 1)
+        self.assertEqual(self.store.stats(),
+                         {"hits": 2, "misses": 1, "size": 2})
+
+    def test_lru_is_bounded_and_invalidated(self):
+        """Проверка вытеснения старых записей и сброса при удалении."""
+        for key in ("first", "second", "third"):
+            self.store._set_raw(key, key)
+        self.assertNotIn("first", self.store._entries)
+        self.store._delete_raw("third")
+        self.assertIsNone(self.store._get_raw("third"))
+        self.store.forget("second")
+        self.assertNotIn("second", self.store._entries)
+
+    def test_misses_are_shared_only_for_lru_timeout(self):
+        """Проверка, что промах хранится в общем кэше не дольше LRU."""
+        with mock.patch.object(cache, "set") as shared_set:
+            self.assertIsNone(self.store._get_raw("missing"))
+        shared_set.assert_called_once_with(
+            "missing", EMPTY_VALUE, self.store.timeout
+        )
+        self.store._set_raw("generated", "value")
+        self.store._evict(["generated"])
+        self.assertEqual(self.store._get_raw("generated"), "value")
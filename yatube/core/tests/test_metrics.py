@@ -0,0 +1,101 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from .. import metrics
+
+TEMP_METRICS_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+METRICS_TOKEN = "scraper-token"
+
+
+@override_settings(METRICS_DIR=TEMP_METRICS_DIR, METRICS_TOKEN=METRICS_TOKEN)
+class MetricsTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_METRICS_DIR, ignore_errors=True)
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.scraper_client = Client(
+            HTTP_AUTHORIZATION=f"Bearer {METRICS_TOKEN}"
+        )
+
+    def test_requests_are_exposed_in_prometheus_format(self):
+        """Проверка вывода времени запросов, запросов к БД и шаблонов."""
+        self.guest_client.get(reverse("about:author"))
+        content = self.scraper_client.get(
+            reverse("metrics")
+        ).content.decode()
+        self.assertIn("# TYPE yatube_request_duration_seconds histogram",
+                      content)
+        self.assertIn(
+            'yatube_request_duration_seconds_bucket{view="about:author",'
+            'method="GET",le="+Inf"}',
+            content,
+        )
+        self.assertIn(
+            'yatube_requests_total{view="about:author",method="GET",'
+            'status="200"}',
+            content,
+        )
+        self.assertIn('yatube_db_queries_total{view="about:author"}',
+                      content)
+        self.assertIn(
+            'yatube_template_render_duration_seconds_count'
+            '{template="about/author.html"}',
+            content,
+        )
+
+    def test_snapshots_of_other_processes_are_summed(self):
+        """Проверка суммирования метрик нескольких процессов."""
+        labels = [["view", "posts:index"], ["method", "GET"],
+                  ["status", 200]]
+        own = dict(metrics.registry.counters).get(
+            ("yatube_requests_total",
+             tuple(map(tuple, labels))), 0
+        )
+        other_path = os.path.join(TEMP_METRICS_DIR, f"{os.getppid()}.json")
+        with open(other_path, "w") as other:
+            json.dump({
+                "counters": [["yatube_requests_total", labels, 41]],
+                "histograms": [],
+            }, other)
+        content = metrics.render()
+        self.assertIn(
+            'yatube_requests_total{view="posts:index",method="GET",'
+            f'status="200"}} {int(own) + 41}',
+            content,
+        )
+
+    def test_snapshots_of_finished_processes_are_dropped(self):
+        """Проверка удаления снимков завершившихся процессов."""
+        finished = subprocess.Popen([sys.executable, "-c", ""])
+        finished.wait()
+        path = os.path.join(TEMP_METRICS_DIR, f"{finished.pid}.json")
+        with open(path, "w") as snapshot_file:
+            json.dump({
+                "counters": [["yatube_dead_total", [], 1]],
+                "histograms": [],
+            }, snapshot_file)
+        self.assertNotIn("yatube_dead_total", metrics.render())
+        self.assertFalse(os.path.exists(path))
+
+    def test_metrics_are_not_public(self):
+        """Проверка закрытого доступа к метрикам."""
+        url = reverse("metrics")
+        self.assertEqual(self.guest_client.get(url).status_code, 403)
+        response = self.guest_client.get(
+            url, HTTP_AUTHORIZATION="Bearer wrong"
+        )
+        self.assertEqual(response.status_code, 403)
+        with self.settings(METRICS_TOKEN=None):
+            response = self.scraper_client.get(url)
+            self.assertEqual(response.status_code, 403)
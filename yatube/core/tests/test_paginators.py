@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+
+from ..paginators import (
+    ELLIPSIS, CountedCursorPaginator, change_cached_count
+)
+
+User = get_user_model()
+
+
+class CountedCursorPaginatorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_page_window_is_elided(self):
+        """Проверка, что окно страниц не растёт с числом страниц."""
+        paginator = CountedCursorPaginator(
+            User.objects.all(), 10, ordering="id", count=100000
+        )
+        self.assertEqual(
+            paginator.page_window(500),
+            [1, ELLIPSIS, 498, 499, 500, 501, 502, ELLIPSIS, 10000],
+        )
+        self.assertEqual(paginator.page_window(1),
+                         [1, 2, 3, ELLIPSIS, 10000])
+        self.assertEqual(paginator.page_window(4),
+                         [1, 2, 3, 4, 5, 6, ELLIPSIS, 10000])
+        single = CountedCursorPaginator(
+            User.objects.all(), 10, ordering="id", count=5
+        )
+        self.assertEqual(single.page_window(1), [])
+
+    def test_count_is_cached_and_changed_by_writes(self):
+        """Проверка, что число объектов считается один раз и обновляется
+        записями."""
+        User.objects.create_user(username="first")
+        paginator = CountedCursorPaginator(
+            User.objects.all(), 10, ordering="id", count_name="users"
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(paginator.count, 1)
+        paginator = CountedCursorPaginator(
+            User.objects.all(), 10, ordering="id", count_name="users"
+        )
+        change_cached_count("users", 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.count, 2)
+
+    def test_approximate_count_uses_statistics(self):
+        """Проверка оценки числа строк по статистике планировщика."""
+        for number in range(3):
+            User.objects.create_user(username=f"user{number}")
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        paginator = CountedCursorPaginator(
+            User.objects.all(), 10, ordering="id", count_name="users",
+            approximate=True,
+        )
+        with mock.patch("core.paginators.APPROXIMATE_COUNT_THRESHOLD", 0):
+            with self.assertNumQueries(1):
+                self.assertEqual(paginator.count, 3)
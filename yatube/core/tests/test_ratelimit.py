@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..ratelimit import hit, parse_rate
+
+User = get_user_model()
+
+
+@override_settings(RATE_LIMITS={
+    "posts:add_comment": "2/m",
+    "posts:profile_follow": "1/m",
+    "login": "1/h",
+})
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="spammer")
+        cls.another_user = User.objects.create_user(username="reader")
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_clients_over_limit_get_429(self):
+        """Проверка ответа 429 после исчерпания лимита пользователя."""
+        post = Post.objects.create(author=self.user, text="Пост")
+        url = reverse("posts:add_comment", kwargs={"post_id": post.id})
+        for _ in range(2):
+            response = self.authorized_client.post(url, {"text": "Спам"})
+            self.assertEqual(response.status_code, 302)
+        response = self.authorized_client.post(url, {"text": "Спам"})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+        self.assertEqual(post.comments.count(), 2)
+        another_client = Client()
+        another_client.force_login(self.another_user)
+        response = another_client.post(url, {"text": "Не спам"})
+        self.assertEqual(response.status_code, 302)
+
+    def test_anonymous_clients_are_limited_by_ip(self):
+        """Проверка лимита анонимных запросов по IP-адресу."""
+        url = reverse("login")
+        credentials = {"username": "spammer", "password": "wrong"}
+        for _ in range(2):
+            self.assertEqual(Client().get(url).status_code, 200)
+        self.assertEqual(Client().post(url, credentials).status_code, 200)
+        self.assertEqual(Client().post(url, credentials).status_code, 429)
+        response = Client(REMOTE_ADDR="10.0.0.2").post(url, credentials)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(RATE_LIMIT_CLIENT_IP_HEADER="HTTP_X_FORWARDED_FOR")
+    def test_client_ip_is_taken_from_proxy_header(self):
+        """Проверка адреса клиента из заголовка прокси."""
+        url = reverse("login")
+        credentials = {"username": "spammer", "password": "wrong"}
+        response = Client(
+            HTTP_X_FORWARDED_FOR="10.0.0.3, 198.51.100.1"
+        ).post(url, credentials)
+        self.assertEqual(response.status_code, 200)
+        response = Client(
+            HTTP_X_FORWARDED_FOR="10.0.0.4, 198.51.100.1"
+        ).post(url, credentials)
+        self.assertEqual(response.status_code, 429)
+        response = Client(
+            HTTP_X_FORWARDED_FOR="198.51.100.2"
+        ).post(url, credentials)
+        self.assertEqual(response.status_code, 200)
+
+    def test_follow_links_are_limited(self):
+        """Проверка лимита подписок, которые делаются GET-запросом."""
+        url = reverse(
+            "posts:profile_follow", kwargs={"username": self.another_user}
+        )
+        response = self.authorized_client.get(url)
+        self.assertEqual(response.status_code, 302)
+        response = self.authorized_client.get(url)
+        self.assertEqual(response.status_code, 429)
+
+    def test_hit_is_one_cache_round_trip(self):
+        """Проверка одного обращения к кэшу на запрос."""
+        self.assertEqual(parse_rate("5/s"), (5, 1))
+        hit("view", "client", 5, 60)
+        with mock.patch.object(cache, "add") as add:
+            self.assertIsNone(hit("view", "client", 5, 60))
+        add.assert_not_called()
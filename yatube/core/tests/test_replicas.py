@@ -0,0 +1,87 @@
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+)
+
+from .. import metrics
+from ..middleware import ReplicaMiddleware
+from ..replicas import (
+    HEARTBEAT_TABLE, REPLICA_PIN_COOKIE, ReplicaRouter, reading_from_replicas,
+    record_lag, sync_sqlite
+)
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], REPLICA_PIN_SECONDS=5)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def test_reads_go_to_replica_until_write(self):
+        """Проверка чтения с реплики до первой записи в запросе."""
+        self.assertEqual(self.router.db_for_read(User), "default")
+        with reading_from_replicas():
+            self.assertEqual(self.router.db_for_read(User), "replica")
+            self.assertEqual(self.router.db_for_write(User), "default")
+            self.assertEqual(self.router.db_for_read(User), "default")
+        with reading_from_replicas(enabled=False):
+            self.assertEqual(self.router.db_for_read(User), "default")
+
+    def test_middleware_pins_client_after_write(self):
+        """Проверка закрепления клиента за основной базой после записи."""
+        def write(request):
+            self.router.db_for_write(User)
+            return HttpResponse()
+
+        def read(request):
+            return HttpResponse(self.router.db_for_read(User))
+
+        response = ReplicaMiddleware(write)(self.factory.post("/"))
+        self.assertEqual(response.cookies[REPLICA_PIN_COOKIE]["max-age"], 5)
+        response = ReplicaMiddleware(read)(self.factory.get("/"))
+        self.assertEqual(response.content, b"replica")
+        self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+        request = self.factory.get("/")
+        request.COOKIES[REPLICA_PIN_COOKIE] = "1"
+        response = ReplicaMiddleware(read)(request)
+        self.assertEqual(response.content, b"default")
+        response = ReplicaMiddleware(read)(self.factory.post("/"))
+        self.assertEqual(response.content, b"default")
+
+
+class ReplicaSyncTests(TransactionTestCase):
+    def test_sync_copies_primary_with_heartbeat(self):
+        """Проверка копирования базы в реплику с отметкой времени."""
+        User.objects.create_user(username="replicated")
+        handle, path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        synced = sync_sqlite(path)
+        with closing(sqlite3.connect(path)) as replica:
+            usernames = [row[0] for row in replica.execute(
+                f"SELECT username FROM {User._meta.db_table}"
+            )]
+            heartbeat = replica.execute(
+                f"SELECT synced FROM {HEARTBEAT_TABLE}"
+            ).fetchone()
+        self.assertIn("replicated", usernames)
+        self.assertEqual(heartbeat, (synced,))
+
+    def test_replica_lag_is_exposed(self):
+        """Проверка метрики отставания реплики."""
+        with mock.patch("core.replicas.get_lag", return_value=3.5), \
+                override_settings(DATABASE_REPLICAS=["replica"]):
+            record_lag()
+        self.assertIn(
+            'yatube_db_replica_lag_seconds{database="replica"} 3.5',
+            metrics.render(),
+        )
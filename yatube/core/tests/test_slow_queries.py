@@ -0,0 +1,48 @@
+import json
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from ..slow_queries import RateLimiter, log_slow_queries, rate_limiter
+
+
+@override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+class SlowQueryLogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        rate_limiter.last_logged.clear()
+        rate_limiter.window_count = 0
+        self.guest_client = Client()
+
+    def test_slow_queries_are_logged_with_view_and_plan(self):
+        """Проверка записи медленных запросов с view и планом."""
+        with self.assertLogs("yatube.slow_queries", "WARNING") as logs:
+            self.guest_client.get(reverse("posts:index"))
+        records = [json.loads(message.split(":", 2)[2])
+                   for message in logs.output]
+        select = next(record for record in records
+                      if record["sql"].startswith("SELECT"))
+        self.assertEqual(select["view"], "posts:index")
+        self.assertTrue(select["plan"])
+        self.assertIn("post_created_id", " ".join(
+            " ".join(record["plan"]) for record in records
+            if record["plan"]
+        ))
+
+    def test_repeated_statements_are_rate_limited(self):
+        """Проверка ограничения частоты записи одинаковых запросов."""
+        with self.assertLogs("yatube.slow_queries", "WARNING") as logs:
+            with log_slow_queries("test"), connection.cursor() as cursor:
+                for _ in range(3):
+                    cursor.execute("SELECT %s", [1])
+        self.assertEqual(len(logs.output), 1)
+
+    def test_rate_limiter_caps_statements_per_minute(self):
+        """Проверка ограничения числа записей в минуту."""
+        limiter = RateLimiter(per_minute=2)
+        self.assertEqual(
+            [limiter.allow(sql) for sql in ("a", "b", "c", "a")],
+            [True, True, False, False],
+        )
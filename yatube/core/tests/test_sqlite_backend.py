@@ -0,0 +1,112 @@
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, connections, transaction
+from django.test import TransactionTestCase
+
+from ..backends.sqlite3.base import read_only_atomic
+
+User = get_user_model()
+
+SCRATCH_ALIAS = "sqlite_backend_scratch"
+
+
+class SQLiteBackendTests(TransactionTestCase):
+    def test_pragmas_are_set_on_connect(self):
+        """Проверка настроек SQLite нового соединения."""
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone(), (1,))
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone(), (5000,))
+
+    def test_write_lock_is_held_for_transaction(self):
+        """Проверка удержания блокировки записи до конца транзакции."""
+        with transaction.atomic():
+            User.objects.create_user(username="writer")
+            self.assertEqual(connection.write_lock_depth, 1)
+            self.assertTrue(connection.connection.in_transaction)
+        self.assertEqual(connection.write_lock_depth, 0)
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                User.objects.create_user(username="rolled back")
+                raise ValueError
+        self.assertEqual(connection.write_lock_depth, 0)
+        self.assertFalse(User.objects.filter(username="rolled back").exists())
+        User.objects.create_user(username="autocommit")
+        self.assertEqual(connection.write_lock_depth, 0)
+
+    def use_scratch_database(self):
+        """Файловая база: тестовая база в памяти не делит блокировки
+        как файл с WAL."""
+        directory = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        connections.databases[SCRATCH_ALIAS] = {
+            "ENGINE": "core.backends.sqlite3",
+            "NAME": f"{directory}/db.sqlite3",
+        }
+        connections.ensure_defaults(SCRATCH_ALIAS)
+        connections.prepare_test_settings(SCRATCH_ALIAS)
+        scratch = connections[SCRATCH_ALIAS]
+
+        def remove():
+            scratch.close()
+            del connections[SCRATCH_ALIAS]
+            del connections.databases[SCRATCH_ALIAS]
+            shutil.rmtree(directory)
+
+        self.addCleanup(remove)
+        with scratch.cursor() as cursor:
+            cursor.execute("CREATE TABLE note (text TEXT)")
+        return scratch
+
+    def test_read_then_write_transaction_is_not_upgraded(self):
+        """Проверка, что транзакция, читающая перед записью, сразу держит
+        блокировку записи и не падает из-за записи другого процесса."""
+        scratch = self.use_scratch_database()
+        other_process = sqlite3.connect(
+            scratch.settings_dict["NAME"], timeout=0.1
+        )
+        self.addCleanup(other_process.close)
+        with transaction.atomic(using=SCRATCH_ALIAS):
+            with scratch.cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM note")
+                with self.assertRaises(sqlite3.OperationalError):
+                    other_process.execute("INSERT INTO note VALUES ('b')")
+                cursor.execute("INSERT INTO note VALUES ('a')")
+        with scratch.cursor() as cursor:
+            cursor.execute("SELECT text FROM note")
+            self.assertEqual(cursor.fetchall(), [("a",)])
+
+    def test_read_only_transaction_does_not_block_writers(self):
+        """Проверка, что читающая транзакция не задерживает запись."""
+        scratch = self.use_scratch_database()
+        reading, finished = threading.Event(), threading.Event()
+
+        def read():
+            try:
+                with read_only_atomic(using=SCRATCH_ALIAS):
+                    with connections[SCRATCH_ALIAS].cursor() as cursor:
+                        cursor.execute("SELECT COUNT(*) FROM note")
+                    reading.set()
+                    finished.wait(10)
+            finally:
+                connections[SCRATCH_ALIAS].close()
+
+        reader = threading.Thread(target=read)
+        try:
+            reader.start()
+            self.assertTrue(reading.wait(5))
+            started = time.monotonic()
+            with transaction.atomic(using=SCRATCH_ALIAS):
+                with scratch.cursor() as cursor:
+                    cursor.execute("INSERT INTO note VALUES ('written')")
+            self.assertLess(time.monotonic() - started, 1)
+            self.assertTrue(reader.is_alive())
+        finally:
+            finished.set()
+            reader.join()
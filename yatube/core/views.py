@@ -1,5 +1,15 @@
+import hmac
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
 from django.shortcuts import render
 
+from . import metrics as metrics_registry
+from .replicas import record_lag
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
 
 def page_not_found(request, exception):
     return render(request, "core/404.html", {"path": request.path}, status=404)
@@ -15,3 +25,17 @@ def server_error(request):
 
 def permission_denied(request, exception):
     return render(request, "core/403.html", status=403)
+
+
+def metrics(request):
+    # Client addresses can't be trusted behind a proxy, so scrapers send
+    # "Authorization: Bearer <METRICS_TOKEN>"; without a token nobody can.
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if not token or not hmac.compare_digest(
+        request.META.get("HTTP_AUTHORIZATION", ""), f"Bearer {token}"
+    ):
+        raise PermissionDenied
+    record_lag()
+    return HttpResponse(
+        metrics_registry.render(), content_type=PROMETHEUS_CONTENT_TYPE
+    )
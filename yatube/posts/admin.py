@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import Group, Post
+from .search import filter_posts
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -10,6 +11,12 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ("created",)
     empty_value_display = "-пусто-"
 
+    def get_search_results(self, request, queryset, search_term):
+        posts = filter_posts(search_term, queryset)
+        if posts is None:
+            return queryset, False
+        return posts, False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
@@ -0,0 +1,86 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers,
+)
+from django.utils.http import quote_etag
+
+from core.caches import shared_timeout
+from core.replicas import reading_from_replicas
+
+FEED_CACHE_TIMEOUT = 60 * 60 * 6
+FEED_GENERATION_KEY = "posts:feed_generation"
+RESPONSE_CACHE_PREFIX = "posts:page"
+
+
+def get_feed_generation():
+    generation = cache.get(FEED_GENERATION_KEY)
+    if generation is None:
+        # Start from the clock so a lost counter never reuses old keys.
+        cache.add(FEED_GENERATION_KEY, int(time.time() * 1000), None)
+        generation = cache.get(FEED_GENERATION_KEY)
+    return generation
+
+
+def bump_feed_generation():
+    try:
+        cache.incr(FEED_GENERATION_KEY)
+    except ValueError:
+        get_feed_generation()
+
+
+def get_feed_cache():
+    return {
+        "timeout": shared_timeout(FEED_CACHE_TIMEOUT),
+        "generation": get_feed_generation(),
+    }
+
+
+def anonymous_response_cache(view):
+    """Cache whole responses of a view for anonymous GET requests.
+
+    Responses carry a strong ETag built from the feed generation, so any
+    write makes it change, and conditional requests are answered with
+    ``304`` from the cache without touching the view. No ``Last-Modified``
+    is sent: edits, deletes and comments do not move any ``created`` date,
+    and one-second dates cannot tell apart versions rendered within the
+    same second. Responses that fill the cache are rendered from the
+    primary: a lagging replica would cache rows older than the generation.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (
+            request.method not in ("GET", "HEAD")
+            or request.user.is_authenticated
+        ):
+            return view(request, *args, **kwargs)
+        digest = hashlib.md5(
+            f"{get_feed_generation()}:{request.get_full_path()}".encode()
+        ).hexdigest()
+        key = f"{RESPONSE_CACHE_PREFIX}:{digest}"
+        etag = quote_etag(digest)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+            else:
+                with reading_from_replicas(enabled=False):
+                    response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                cache.set(
+                    key,
+                    (response.content, response["Content-Type"]),
+                    shared_timeout(FEED_CACHE_TIMEOUT),
+                )
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, max_age=0)
+        patch_vary_headers(response, ("Cookie",))
+        return response
+    return wrapper
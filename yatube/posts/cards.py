@@ -0,0 +1,93 @@
+import time
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from core.caches import shared_timeout
+
+from .cache import FEED_CACHE_TIMEOUT
+from .thumbnails import thumbnails_ready
+
+CARD_CACHE_TIMEOUT = FEED_CACHE_TIMEOUT
+# Cards whose thumbnail or srcset variants are still being generated.
+CARD_FALLBACK_TIMEOUT = 60
+CARD_CACHE_PREFIX = "posts:card"
+CARD_VERSION_PREFIX = "posts:card_version"
+CARD_TEMPLATE = "posts/includes/post_card.html"
+
+
+def version_key(kind, pk):
+    return f"{CARD_VERSION_PREFIX}:{kind}:{pk}"
+
+
+def get_versions(keys):
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        # Start from the clock so a lost counter never reuses old keys.
+        seed = int(time.time() * 1000)
+        for key in missing:
+            cache.add(key, seed, None)
+        versions.update(cache.get_many(missing))
+    return versions
+
+
+def bump_card_versions(kind, pks):
+    for pk in pks:
+        try:
+            cache.incr(version_key(kind, pk))
+        except ValueError:
+            pass
+
+
+def get_card_key(post, template, versions):
+    group_version = (
+        versions.get(version_key("group", post.group_id))
+        if post.group_id else 0
+    )
+    return ":".join(map(str, (
+        CARD_CACHE_PREFIX,
+        template,
+        post.pk,
+        versions.get(version_key("post", post.pk)),
+        versions.get(version_key("author", post.author_id)),
+        group_version,
+    )))
+
+
+def render_cards(posts, template=CARD_TEMPLATE):
+    """Return ``(post, html)`` pairs rendering ``posts`` with ``template``.
+
+    Cards are cached under the versions of the post, its author and its
+    group, so any feed showing a post reuses the same fragment until one
+    of them changes. Cards render nothing that depends on the viewer.
+    """
+    posts = list(posts)
+    if not posts:
+        return []
+    keys = set()
+    for post in posts:
+        keys.add(version_key("post", post.pk))
+        keys.add(version_key("author", post.author_id))
+        if post.group_id:
+            keys.add(version_key("group", post.group_id))
+    versions = get_versions(list(keys))
+    card_keys = [get_card_key(post, template, versions) for post in posts]
+    cached = cache.get_many(card_keys)
+    fresh, pending = {}, {}
+    cards = []
+    for post, key in zip(posts, card_keys):
+        html = cached.get(key)
+        if html is None:
+            html = render_to_string(template, {"post": post})
+            if post.image and not thumbnails_ready(post.image):
+                pending[key] = html
+            else:
+                fresh[key] = html
+        cards.append((post, mark_safe(html)))
+    if fresh:
+        cache.set_many(fresh, shared_timeout(CARD_CACHE_TIMEOUT))
+    if pending:
+        cache.set_many(pending, CARD_FALLBACK_TIMEOUT)
+    return cards
@@ -0,0 +1,149 @@
+from django.db import transaction
+from django.db.models import Count, F
+
+from core.paginators import change_cached_count, forget_cached_counts
+
+from .cards import bump_card_versions
+from .models import AuthorStats, Comment, Follow, Group, Post
+
+
+INDEX_COUNT_NAME = "posts:index"
+
+
+def group_count_name(group_id):
+    return f"posts:group:{group_id}"
+
+
+def change_feed_counts(group_id, delta):
+    """Keep the cached index and group totals of the paginator current."""
+    change_cached_count(INDEX_COUNT_NAME, delta)
+    if group_id:
+        change_cached_count(group_count_name(group_id), delta)
+
+
+def move_group_count(old_group_id, new_group_id):
+    for group_id, delta in ((old_group_id, -1), (new_group_id, 1)):
+        if group_id:
+            change_cached_count(group_count_name(group_id), delta)
+
+
+def forget_feed_counts():
+    """Drop cached feed totals after writes that bypass the signals."""
+    forget_cached_counts([
+        INDEX_COUNT_NAME,
+        *map(group_count_name, Group.objects.values_list("id", flat=True)),
+    ])
+
+
+def get_posts_count(user):
+    try:
+        return user.stats.posts_count
+    except AuthorStats.DoesNotExist:
+        return 0
+
+
+def get_follow_counts(user):
+    """``(followers, following)`` of ``user``."""
+    try:
+        return user.stats.followers_count, user.stats.following_count
+    except AuthorStats.DoesNotExist:
+        return 0, 0
+
+
+def count_stats(user_id):
+    return {
+        "posts_count": Post.objects.filter(author_id=user_id).count(),
+        "followers_count": Follow.objects.filter(author_id=user_id).count(),
+        "following_count": Follow.objects.filter(user_id=user_id).count(),
+    }
+
+
+def change_stat(user_id, field, delta):
+    with transaction.atomic():
+        updated = AuthorStats.objects.filter(
+            user_id=user_id, **{f"{field}__gte": -delta}
+        ).update(**{field: F(field) + delta})
+        if not updated and delta > 0:
+            AuthorStats.objects.get_or_create(
+                user_id=user_id, defaults=count_stats(user_id)
+            )
+
+
+def change_posts_count(author_id, delta):
+    change_stat(author_id, "posts_count", delta)
+
+
+def change_follow_counts(user_id, author_id, delta):
+    change_stat(author_id, "followers_count", delta)
+    change_stat(user_id, "following_count", delta)
+
+
+def change_comments_count(post_id, delta):
+    Post.objects.filter(
+        pk=post_id, comments_count__gte=-delta
+    ).update(comments_count=F("comments_count") + delta)
+
+
+def recount_comments(post_ids):
+    counts = count_by(Comment.objects.filter(post_id__in=post_ids), "post_id")
+    posts = []
+    for post in Post.objects.filter(pk__in=post_ids).only(
+        "pk", "comments_count"
+    ):
+        total = counts.get(post.pk, 0)
+        if post.comments_count != total:
+            post.comments_count = total
+            posts.append(post)
+    with transaction.atomic():
+        Post.objects.bulk_update(posts, ["comments_count"])
+    bump_card_versions("post", [post.pk for post in posts])
+    return len(posts)
+
+
+def recount_stat(user_ids, field, counts):
+    existing = {
+        stats.user_id: stats
+        for stats in AuthorStats.objects.filter(user_id__in=user_ids)
+    }
+    changed = [
+        stats for user_id, stats in existing.items()
+        if getattr(stats, field) != counts.get(user_id, 0)
+    ]
+    for stats in changed:
+        setattr(stats, field, counts.get(stats.user_id, 0))
+    missing = [
+        AuthorStats(user_id=user_id, **{field: total})
+        for user_id, total in counts.items()
+        if user_id not in existing
+    ]
+    with transaction.atomic():
+        AuthorStats.objects.bulk_update(changed, [field])
+        AuthorStats.objects.bulk_create(missing, ignore_conflicts=True)
+    return len(changed) + len(missing)
+
+
+def count_by(queryset, field):
+    return dict(
+        queryset.order_by()
+        .values(field)
+        .annotate(total=Count("id"))
+        .values_list(field, "total")
+    )
+
+
+def recount_posts(user_ids):
+    counts = count_by(Post.objects.filter(author_id__in=user_ids), "author_id")
+    return recount_stat(user_ids, "posts_count", counts)
+
+
+def recount_follows(user_ids):
+    followers = count_by(
+        Follow.objects.filter(author_id__in=user_ids), "author_id"
+    )
+    following = count_by(
+        Follow.objects.filter(user_id__in=user_ids), "user_id"
+    )
+    return (
+        recount_stat(user_ids, "followers_count", followers)
+        + recount_stat(user_ids, "following_count", following)
+    )
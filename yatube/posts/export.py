@@ -0,0 +1,126 @@
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, Post
+
+EXPORT_CHUNK_SIZE = 500
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "zip": ("application/zip", "zip"),
+}
+EXPORT_DATA_NAME = "data.ndjson"
+EXPORT_IMAGES_DIR = "images/"
+
+
+def iterate_chunks(queryset, fields):
+    """Yield ``values()`` rows fetched by id ranges of EXPORT_CHUNK_SIZE.
+
+    Unlike one big cursor this keeps no query open while the client is
+    slowly reading the response.
+    """
+    last_id = 0
+    while True:
+        rows = list(
+            queryset.filter(id__gt=last_id).order_by("id")
+            .values("id", *fields)[:EXPORT_CHUNK_SIZE]
+        )
+        yield from rows
+        if len(rows) < EXPORT_CHUNK_SIZE:
+            return
+        last_id = rows[-1]["id"]
+
+
+def export_rows(user):
+    """Rows of ``user``'s data in the format read by ``import_yatube``."""
+    yield {
+        "model": "user",
+        "username": user.username,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+    }
+    posts = Post.objects.filter(author=user)
+    for row in iterate_chunks(posts, ("text", "created", "group__slug",
+                                      "image")):
+        yield {
+            "model": "post",
+            "id": row["id"],
+            "author": user.username,
+            "group": row["group__slug"],
+            "text": row["text"],
+            "created": row["created"],
+            "image": row["image"],
+            "image_url": (
+                default_storage.url(row["image"]) if row["image"] else None
+            ),
+        }
+    comments = Comment.objects.filter(author=user)
+    for row in iterate_chunks(comments, ("post_id", "text", "created")):
+        yield {
+            "model": "comment",
+            "id": row["id"],
+            "post": row["post_id"],
+            "author": user.username,
+            "text": row["text"],
+            "created": row["created"],
+        }
+
+
+def export_ndjson(user):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in export_rows(user):
+        yield (encoder.encode(row) + "\n").encode()
+
+
+class StreamBuffer:
+    """Write-only file object that hands written bytes out on ``pop()``."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def export_zip(user):
+    """Stream a zip with the NDJSON data and the post images.
+
+    ``ZipFile`` writes to the unseekable buffer with data descriptors, so
+    every chunk can be sent as soon as it is compressed.
+    """
+    buffer = StreamBuffer()
+    with ZipFile(buffer, "w", ZIP_DEFLATED) as archive:
+        with archive.open(EXPORT_DATA_NAME, "w", force_zip64=True) as data:
+            for line in export_ndjson(user):
+                data.write(line)
+                yield buffer.pop()
+        images = Post.objects.filter(author=user).exclude(image="")
+        for row in iterate_chunks(images, ("image",)):
+            name = row["image"]
+            if not default_storage.exists(name):
+                continue
+            with default_storage.open(name) as source, archive.open(
+                EXPORT_IMAGES_DIR + name, "w", force_zip64=True
+            ) as target:
+                for chunk in source.chunks():
+                    target.write(chunk)
+                    yield buffer.pop()
+    yield buffer.pop()
+
+
+def export_stream(user, export_format):
+    if export_format == "zip":
+        chunks = export_zip(user)
+    else:
+        chunks = export_ndjson(user)
+    return (chunk for chunk in chunks if chunk)
@@ -0,0 +1,260 @@
+from collections import Counter
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import counters, search, timeline
+from .cache import bump_feed_generation
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+IMPORT_BATCH_SIZE = 1000
+# Keeps ``IN (...)`` lookups under SQLite's limit of bound parameters.
+LOOKUP_CHUNK_SIZE = 500
+# Models in dependency order: rows may only refer to models listed earlier.
+IMPORT_MODELS = ("user", "group", "post", "comment", "follow")
+
+
+def chunks(values, size=LOOKUP_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def parse_created(row):
+    value = row.get("created")
+    if not value:
+        return timezone.now()
+    created = parse_datetime(value)
+    if created is None:
+        raise ValueError(f"Некорректная дата: {value}")
+    if timezone.is_naive(created):
+        created = timezone.make_aware(created, timezone.utc)
+    return created
+
+
+def insert_new(model, objects):
+    """``bulk_create`` that skips conflicting rows and returns the ids of
+    the rows actually inserted.
+
+    New rows are told apart by their ids, which only grow; the batch
+    transaction keeps other writers out in between.
+    """
+    last_id = model.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+    model.objects.bulk_create(objects, ignore_conflicts=True)
+    return list(
+        model.objects.filter(id__gt=last_id).values_list("id", flat=True)
+    )
+
+
+@contextmanager
+def keep_created(*models):
+    """Let ``bulk_create`` store ``created`` as given instead of now."""
+    fields = [model._meta.get_field("created") for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Importer:
+    """Bulk loader of legacy users, groups, posts, comments and follows.
+
+    Rows are buffered per model and written with ``bulk_create``, one
+    transaction per batch. References are resolved through in-memory maps
+    (username, group slug, post id) that fall back to the database for
+    objects imported earlier. ``bulk_create`` sends no signals, so
+    ``finish()`` recounts counters, indexes texts and rebuilds timelines of
+    the affected authors.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.pending = {model: [] for model in IMPORT_MODELS}
+        self.users = {}
+        self.groups = {}
+        self.post_ids = set()
+        self.imported = Counter()
+        self.skipped = Counter()
+        self.transactions = 0
+        self.authors = set()
+        self.commented_posts = set()
+        self.follows = set()
+        self.follow_ids = set()
+
+    def add(self, row):
+        model = row.get("model")
+        if model not in self.pending:
+            raise ValueError(f"Неизвестная модель: {model}")
+        self.pending[model].append(row)
+        if len(self.pending[model]) >= self.batch_size:
+            self.flush(model)
+
+    def flush(self, model=IMPORT_MODELS[-1]):
+        """Write buffered rows of ``model`` and of the models it refers to."""
+        for name in IMPORT_MODELS[:IMPORT_MODELS.index(model) + 1]:
+            rows, self.pending[name] = self.pending[name], []
+            if rows:
+                with transaction.atomic():
+                    getattr(self, f"insert_{name}s")(rows)
+                self.transactions += 1
+
+    def finish(self):
+        self.flush()
+        for post_ids in chunks(sorted(self.commented_posts)):
+            counters.recount_comments(post_ids)
+        for author_ids in chunks(sorted(self.authors)):
+            counters.recount_posts(author_ids)
+            for follow_id, user_id, author_id in Follow.objects.filter(
+                author_id__in=author_ids
+            ).values_list("id", "user_id", "author_id"):
+                self.follow_ids.add(follow_id)
+                self.follows.add((user_id, author_id))
+        followers = {user_id for pair in self.follows for user_id in pair}
+        for user_ids in chunks(sorted(followers)):
+            counters.recount_follows(user_ids)
+        # Follower counts have changed, and with them the celebrities.
+        cache.delete(timeline.CELEBRITIES_CACHE_KEY)
+        for follow_ids in chunks(sorted(self.follow_ids)):
+            timeline.backfill_follows(Follow.objects.filter(id__in=follow_ids))
+        counters.forget_feed_counts()
+        bump_feed_generation()
+
+    def resolve(self, known, model, field, values):
+        missing = {value for value in values if value not in known}
+        for chunk in chunks(missing):
+            known.update(
+                model.objects.filter(**{f"{field}__in": chunk})
+                .values_list(field, "id")
+            )
+
+    def new_ids(self, model, rows):
+        """Skip rows whose ``id`` is already taken."""
+        ids = [int(row["id"]) for row in rows if row.get("id")]
+        taken = set()
+        for chunk in chunks(ids):
+            taken.update(
+                model.objects.filter(id__in=chunk)
+                .values_list("id", flat=True)
+            )
+        return [row for row in rows if int(row.get("id") or 0) not in taken]
+
+    def insert_users(self, rows):
+        users = [
+            User(
+                username=row["username"],
+                first_name=row.get("first_name", ""),
+                last_name=row.get("last_name", ""),
+                email=row.get("email", ""),
+                password=row.get("password") or make_password(None),
+            )
+            for row in rows
+        ]
+        inserted = insert_new(User, users)
+        self.resolve(self.users, User, "username",
+                     [user.username for user in users])
+        self.imported["user"] += len(inserted)
+        self.skipped["user"] += len(users) - len(inserted)
+
+    def insert_groups(self, rows):
+        groups = [
+            Group(
+                slug=row["slug"],
+                title=row.get("title", row["slug"]),
+                description=row.get("description", ""),
+            )
+            for row in rows
+        ]
+        inserted = insert_new(Group, groups)
+        self.resolve(self.groups, Group, "slug",
+                     [group.slug for group in groups])
+        self.imported["group"] += len(inserted)
+        self.skipped["group"] += len(groups) - len(inserted)
+
+    def insert_posts(self, rows):
+        if any(not row.get("id") for row in rows):
+            raise ValueError("У каждого поста должен быть id")
+        new_rows = self.new_ids(Post, rows)
+        self.skipped["post"] += len(rows) - len(new_rows)
+        self.resolve(self.users, User, "username",
+                     [row["author"] for row in new_rows])
+        self.resolve(self.groups, Group, "slug",
+                     [row["group"] for row in new_rows if row.get("group")])
+        posts = []
+        for row in new_rows:
+            author_id = self.users.get(row["author"])
+            if author_id is None:
+                self.skipped["post"] += 1
+                continue
+            posts.append(Post(
+                id=int(row["id"]),
+                author_id=author_id,
+                group_id=self.groups.get(row.get("group")),
+                text=row.get("text", ""),
+                image=row.get("image", ""),
+                created=parse_created(row),
+            ))
+        with keep_created(Post):
+            Post.objects.bulk_create(posts)
+        search.index_posts((post.id, post.text) for post in posts)
+        self.post_ids.update(post.id for post in posts)
+        self.authors.update(post.author_id for post in posts)
+        self.imported["post"] += len(posts)
+
+    def insert_comments(self, rows):
+        new_rows = self.new_ids(Comment, rows)
+        self.skipped["comment"] += len(rows) - len(new_rows)
+        self.resolve(self.users, User, "username",
+                     [row["author"] for row in new_rows])
+        unknown_posts = {int(row["post"]) for row in new_rows} - self.post_ids
+        for chunk in chunks(unknown_posts):
+            self.post_ids.update(
+                Post.objects.filter(id__in=chunk).values_list("id", flat=True)
+            )
+        comments = []
+        for row in new_rows:
+            author_id = self.users.get(row["author"])
+            post_id = int(row["post"])
+            if author_id is None or post_id not in self.post_ids:
+                self.skipped["comment"] += 1
+                continue
+            comments.append(Comment(
+                id=int(row["id"]) if row.get("id") else None,
+                post_id=post_id,
+                author_id=author_id,
+                text=row.get("text", ""),
+                created=parse_created(row),
+            ))
+        with keep_created(Comment):
+            Comment.objects.bulk_create(comments)
+        self.commented_posts.update(comment.post_id for comment in comments)
+        self.imported["comment"] += len(comments)
+
+    def insert_follows(self, rows):
+        self.resolve(self.users, User, "username",
+                     [row[key] for row in rows for key in ("user", "author")])
+        follows = []
+        for row in rows:
+            user_id = self.users.get(row["user"])
+            author_id = self.users.get(row["author"])
+            if user_id is None or author_id is None or user_id == author_id:
+                self.skipped["follow"] += 1
+                continue
+            follows.append(Follow(user_id=user_id, author_id=author_id))
+        inserted = insert_new(Follow, follows)
+        self.follow_ids.update(inserted)
+        self.follows.update(
+            (follow.user_id, follow.author_id) for follow in follows
+        )
+        self.imported["follow"] += len(inserted)
+        self.skipped["follow"] += len(follows) - len(inserted)
@@ -0,0 +1,235 @@
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from core.replicas import sync_sqlite
+
+BENCHMARK_ALIAS = "concurrency_benchmark"
+# Compared configurations: engine and the journal mode of the copy.
+CONCURRENCY_ENGINES = {
+    "stock": ("django.db.backends.sqlite3", "DELETE"),
+    "tuned": ("core.backends.sqlite3", "WAL"),
+}
+CONCURRENCY_WORKERS = 4
+CONCURRENCY_THREADS = 2
+CONCURRENCY_SECONDS = 5
+WRITE_SHARE = 0.2
+FEED_SIZE = 10
+
+
+def run_thread(alias, deadline, write_share, seed, post_ids, user_ids):
+    from django.db import OperationalError, transaction
+    from django.db.models import F
+
+    from posts.models import Comment, Post
+
+    rng = random.Random(seed)
+    result = {"reads": 0, "writes": 0, "errors": 0, "write_ms": []}
+    try:
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                if rng.random() < write_share:
+                    post_id = rng.choice(post_ids)
+                    with transaction.atomic(using=alias):
+                        Comment.objects.using(alias).bulk_create([Comment(
+                            post_id=post_id,
+                            author_id=rng.choice(user_ids),
+                            text="Нагрузка",
+                        )])
+                        Post.objects.using(alias).filter(pk=post_id).update(
+                            comments_count=F("comments_count") + 1
+                        )
+                    result["writes"] += 1
+                    result["write_ms"].append(
+                        (time.perf_counter() - started) * 1000
+                    )
+                else:
+                    list(
+                        Post.objects.using(alias)
+                        .select_related("author", "group")
+                        .order_by("-created")[:FEED_SIZE]
+                    )
+                    result["reads"] += 1
+            except OperationalError:
+                result["errors"] += 1
+    finally:
+        connections[alias].close()
+    return result
+
+
+def run_worker(database, threads, seconds, write_share, seed):
+    """Run ``threads`` readers/writers against ``database`` in a fresh
+    process, like one gunicorn worker."""
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "yatube.settings")
+    django.setup()
+    from posts.models import Post
+
+    connections.databases[BENCHMARK_ALIAS] = database
+    connections.ensure_defaults(BENCHMARK_ALIAS)
+    connections.prepare_test_settings(BENCHMARK_ALIAS)
+    posts = Post.objects.using(BENCHMARK_ALIAS)
+    post_ids = list(posts.values_list("id", flat=True)[:10000])
+    user_ids = list(
+        posts.values_list("author_id", flat=True).distinct()[:1000]
+    )
+    connections[BENCHMARK_ALIAS].close()
+    deadline = time.monotonic() + seconds
+    results = []
+
+    def target(number):
+        results.append(run_thread(
+            BENCHMARK_ALIAS, deadline, write_share, seed * 1000 + number,
+            post_ids, user_ids,
+        ))
+
+    workers = [
+        threading.Thread(target=target, args=(number,))
+        for number in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает пропускную способность чтения и записи SQLite "
+        "со стандартным и настроенным бэкендом под конкурентной нагрузкой."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=CONCURRENCY_WORKERS,
+            help="Число процессов.",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=CONCURRENCY_THREADS,
+            help="Число потоков в каждом процессе.",
+        )
+        parser.add_argument(
+            "--seconds",
+            type=float,
+            default=CONCURRENCY_SECONDS,
+            help="Длительность замера каждой конфигурации.",
+        )
+        parser.add_argument(
+            "--write-share",
+            type=float,
+            default=WRITE_SHARE,
+            help="Доля операций записи.",
+        )
+        parser.add_argument(
+            "--engine",
+            action="append",
+            choices=sorted(CONCURRENCY_ENGINES),
+            help="Замеряемые конфигурации; по умолчанию — все.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Файл результатов; по умолчанию — стандартный вывод.",
+        )
+
+    def handle(self, *args, **options):
+        if connections[DEFAULT_DB_ALIAS].vendor != "sqlite":
+            raise CommandError("Замер рассчитан только на SQLite")
+        from posts.models import Post
+
+        if not Post.objects.exists():
+            raise CommandError(
+                "Нет данных для замеров, запустите seed_benchmark"
+            )
+        results = [
+            self.measure(name, options)
+            for name in options["engine"] or CONCURRENCY_ENGINES
+        ]
+        report = {
+            "meta": {
+                "started": timezone.now().isoformat(),
+                "sqlite": sqlite3.sqlite_version,
+                "workers": options["workers"],
+                "threads": options["threads"],
+                "seconds": options["seconds"],
+                "write_share": options["write_share"],
+            },
+            "results": results,
+        }
+        content = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.write(content)
+        else:
+            self.stdout.write(content)
+
+    def measure(self, name, options):
+        engine, journal_mode = CONCURRENCY_ENGINES[name]
+        directory = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        path = os.path.join(directory, "db.sqlite3")
+        try:
+            # Every configuration starts from the same copy of the data.
+            sync_sqlite(path)
+            with closing(sqlite3.connect(path)) as copy:
+                copy.execute(f"PRAGMA journal_mode = {journal_mode}")
+            database = {"ENGINE": engine, "NAME": path}
+            with ProcessPoolExecutor(
+                max_workers=options["workers"],
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        run_worker, database, options["threads"],
+                        options["seconds"], options["write_share"], seed,
+                    )
+                    for seed in range(options["workers"])
+                ]
+                threads = [
+                    thread for future in futures for thread in future.result()
+                ]
+        finally:
+            for file_name in os.listdir(directory):
+                os.remove(os.path.join(directory, file_name))
+            os.rmdir(directory)
+        write_ms = sorted(
+            ms for thread in threads for ms in thread["write_ms"]
+        )
+        seconds = options["seconds"]
+        summary = {
+            "engine": name,
+            "reads_per_second": round(
+                sum(thread["reads"] for thread in threads) / seconds, 1
+            ),
+            "writes_per_second": round(
+                sum(thread["writes"] for thread in threads) / seconds, 1
+            ),
+            "errors": sum(thread["errors"] for thread in threads),
+            "write_ms": {
+                "p50": round(write_ms[len(write_ms) // 2], 3),
+                "p99": round(write_ms[len(write_ms) * 99 // 100], 3),
+            } if write_ms else {},
+        }
+        self.stderr.write(
+            f"{name}: чтений {summary['reads_per_second']}/с, "
+            f"записей {summary['writes_per_second']}/с, "
+            f"ошибок {summary['errors']}"
+        )
+        return summary
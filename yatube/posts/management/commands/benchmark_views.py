@@ -0,0 +1,209 @@
+import json
+import platform
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from posts import urls
+from posts.models import Comment, Follow, Group, Post, TimelineEntry
+
+User = get_user_model()
+
+BENCHMARK_ITERATIONS = 20
+PERCENTILES = (50, 90, 99)
+# Views that change data on GET are measured by other means.
+UNSAFE_VIEWS = {"profile_follow", "profile_unfollow"}
+
+
+def percentile(values, rank):
+    """Nearest-rank percentile of sorted ``values``."""
+    index = max(0, -(-rank * len(values) // 100) - 1)
+    return values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет задержку, число запросов и пик памяти для каждого "
+        "адреса posts/urls.py и сохраняет результаты в JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=BENCHMARK_ITERATIONS,
+            help="Число повторов каждого запроса.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Файл результатов; по умолчанию — стандартный вывод.",
+        )
+        parser.add_argument(
+            "--compare",
+            help="Файл результатов прошлого запуска для сравнения.",
+        )
+        parser.add_argument(
+            "--label",
+            default="",
+            help="Метка запуска, попадает в результаты.",
+        )
+
+    def handle(self, *args, **options):
+        kwargs = self.sample_kwargs()
+        user = self.sample_user()
+        results = []
+        # Nothing a measured view writes (sessions, counters) is kept.
+        with transaction.atomic():
+            clients = {"anonymous": Client(), "authenticated": Client()}
+            clients["authenticated"].force_login(user)
+            for name, url in self.urls(kwargs):
+                for client_name, client in clients.items():
+                    results.append(self.measure(
+                        name, url, client_name, client,
+                        options["iterations"],
+                    ))
+            transaction.set_rollback(True)
+        report = {"meta": self.meta(options), "results": results}
+        content = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.write(content)
+        else:
+            self.stdout.write(content)
+        if options["compare"]:
+            self.compare(options["compare"], results)
+
+    def sample_kwargs(self):
+        """URL arguments pointing at the heaviest objects of the dataset."""
+        post = Post.objects.order_by("-comments_count", "id").first()
+        author = User.objects.annotate(
+            posts=Count("post")
+        ).order_by("-posts", "id").first()
+        group = Group.objects.annotate(
+            total=Count("posts")
+        ).order_by("-total", "id").first()
+        if not (post and author and group):
+            raise CommandError(
+                "Нет данных для замеров, запустите seed_benchmark"
+            )
+        return {
+            "post_id": post.id,
+            "username": author.username,
+            "slug": group.slug,
+        }
+
+    def sample_user(self):
+        """The reader with the biggest follow feed."""
+        follow = Follow.objects.values("user_id").annotate(
+            total=Count("id")
+        ).order_by("-total", "user_id").first()
+        if follow is None:
+            return User.objects.order_by("id").first()
+        return User.objects.get(id=follow["user_id"])
+
+    def urls(self, kwargs):
+        for pattern in urls.urlpatterns:
+            if not isinstance(pattern, URLPattern):
+                continue
+            if pattern.name in UNSAFE_VIEWS:
+                continue
+            name = f"{urls.app_name}:{pattern.name}"
+            arguments = {
+                key: kwargs[key] for key in pattern.pattern.converters
+            }
+            yield name, reverse(name, kwargs=arguments)
+
+    def request(self, client, url):
+        response = client.get(url)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
+
+    def measure(self, name, url, client_name, client, iterations):
+        cache.clear()
+        # Requests reset the query log, so the context has to start on an
+        # empty one, and it has to be counted before the next request.
+        reset_queries()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = self.request(client, url)
+            cold = time.perf_counter() - started
+        cold_queries = len(captured)
+        reset_queries()
+        with CaptureQueriesContext(connection) as captured:
+            self.request(client, url)
+        queries = len(captured)
+        latencies = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            self.request(client, url)
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        cache.clear()
+        tracemalloc.start()
+        try:
+            self.request(client, url)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return {
+            "name": name,
+            "url": url,
+            "client": client_name,
+            "status": response.status_code,
+            "cold_ms": round(cold * 1000, 3),
+            "latency_ms": {
+                f"p{rank}": round(percentile(latencies, rank), 3)
+                for rank in PERCENTILES
+            } if latencies else {},
+            "cold_queries": cold_queries,
+            "queries": queries,
+            "peak_memory_kb": round(peak / 1024, 1),
+        }
+
+    def meta(self, options):
+        return {
+            "label": options["label"],
+            "started": timezone.now().isoformat(),
+            "iterations": options["iterations"],
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": sys.platform,
+            "dataset": {
+                model.__name__: model.objects.count()
+                for model in (User, Group, Post, Comment, Follow,
+                              TimelineEntry)
+            },
+        }
+
+    def compare(self, path, results):
+        with open(path, encoding="utf-8") as previous_file:
+            previous = {
+                (result["name"], result["client"]): result
+                for result in json.load(previous_file)["results"]
+            }
+        for result in results:
+            before = previous.get((result["name"], result["client"]))
+            if not before or not before["latency_ms"]:
+                continue
+            old = before["latency_ms"]["p50"]
+            new = result["latency_ms"]["p50"]
+            self.stderr.write(
+                f"{result['name']} ({result['client']}): "
+                f"p50 {old} → {new} мс ({new / max(old, 1e-6):.2f}×), "
+                f"запросов {before['queries']} → {result['queries']}"
+            )
@@ -0,0 +1,38 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import EXPORT_FORMATS, export_stream
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Выгружает посты, комментарии и картинки пользователя."
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument(
+            "--format",
+            choices=EXPORT_FORMATS,
+            default="ndjson",
+            help="Формат выгрузки.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Файл для выгрузки; по умолчанию — стандартный вывод.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["username"])
+        except User.DoesNotExist:
+            raise CommandError("Пользователь не найден")
+        chunks = export_stream(user, options["format"])
+        if options["output"]:
+            with open(options["output"], "wb") as output:
+                output.writelines(chunks)
+        else:
+            self.stdout.flush()
+            sys.stdout.buffer.writelines(chunks)
@@ -0,0 +1,77 @@
+import os
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from posts.cache import bump_feed_generation
+from posts.thumbnails import (
+    THUMBNAIL_WORKERS, forget_thumbnails, generate_thumbnails, make_executor
+)
+
+IMAGES_DIR = "posts/"
+CHUNK_SIZE = 16
+
+
+def try_generate_thumbnails(name):
+    """``generate_thumbnails`` that reports a broken image instead of
+    stopping the whole backfill."""
+    try:
+        return name, generate_thumbnails(name), None
+    except Exception as error:
+        return name, None, f"{type(error).__name__}: {error}"
+
+
+class Command(BaseCommand):
+    help = "Создаёт миниатюры и адаптивные варианты картинок постов."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=THUMBNAIL_WORKERS,
+            help="Число процессов; 0 — создавать в текущем процессе.",
+        )
+
+    def handle(self, *args, **options):
+        names = list(self.image_names(IMAGES_DIR))
+        workers = options["workers"]
+        if workers > 0 and names:
+            with make_executor(workers) as executor:
+                results = executor.map(
+                    try_generate_thumbnails, names, chunksize=CHUNK_SIZE
+                )
+                created, failed = self.collect(results)
+        else:
+            created, failed = self.collect(
+                map(try_generate_thumbnails, names)
+            )
+        if created:
+            bump_feed_generation()
+        message = (
+            f"Картинок: {len(names)}, обновлено: {created}, "
+            f"ошибок: {failed}"
+        )
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(style(message))
+
+    def collect(self, results):
+        created = failed = 0
+        for name, result, error in results:
+            if error is not None:
+                failed += 1
+                self.stderr.write(f"{name}: {error}")
+                continue
+            thumbnail_names, image_created = result
+            if image_created:
+                forget_thumbnails(thumbnail_names)
+                created += 1
+        return created, failed
+
+    def image_names(self, path):
+        if not default_storage.exists(path):
+            return
+        dirs, files = default_storage.listdir(path)
+        for name in sorted(files):
+            yield path + name
+        for name in sorted(dirs):
+            yield from self.image_names(os.path.join(path, name) + "/")
@@ -0,0 +1,108 @@
+import csv
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.importer import IMPORT_BATCH_SIZE, IMPORT_MODELS, Importer
+
+FORMATS = ("jsonl", "csv")
+
+
+class Command(BaseCommand):
+    help = (
+        "Загружает пользователей, группы, посты, комментарии и подписки "
+        "из файлов JSONL или CSV."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="+",
+            help="Файлы для загрузки; «-» — стандартный ввод.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Формат файлов; по умолчанию определяется по расширению.",
+        )
+        parser.add_argument(
+            "--model",
+            choices=IMPORT_MODELS,
+            help="Модель строк, в которых нет поля model.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Число строк, записываемых в одной транзакции.",
+        )
+
+    def handle(self, *args, **options):
+        importer = Importer(options["batch_size"])
+        started = time.monotonic()
+        rows = sum(
+            self.load(importer, path, options["format"], options["model"])
+            for path in options["paths"]
+        )
+        try:
+            importer.finish()
+        except KeyError as error:
+            raise CommandError(f"нет поля {error}")
+        except ValueError as error:
+            raise CommandError(error)
+        elapsed = time.monotonic() - started
+        for model in IMPORT_MODELS:
+            self.stdout.write(
+                f"{model}: загружено {importer.imported[model]}, "
+                f"пропущено {importer.skipped[model]}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Строк: {rows} за {elapsed:.1f} с "
+            f"({rows / max(elapsed, 1e-6):.0f} строк/с), "
+            f"транзакций: {importer.transactions}"
+        ))
+
+    def load(self, importer, path, file_format, model):
+        file_format = file_format or (
+            "csv" if path.endswith(".csv") else "jsonl"
+        )
+        rows = 0
+        with self.open(path) as file:
+            for line, row in self.read(file, file_format):
+                if model:
+                    row.setdefault("model", model)
+                try:
+                    importer.add(row)
+                except KeyError as error:
+                    raise CommandError(f"{path}:{line}: нет поля {error}")
+                except ValueError as error:
+                    raise CommandError(f"{path}:{line}: {error}")
+                rows += 1
+        return rows
+
+    def open(self, path):
+        if path == "-":
+            return open(sys.stdin.fileno(), encoding="utf-8", closefd=False)
+        try:
+            return open(path, encoding="utf-8", newline="")
+        except OSError as error:
+            raise CommandError(error)
+
+    def read(self, file, file_format):
+        """Yield ``(line number, row)`` without reading the whole file."""
+        if file_format == "csv":
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, {
+                    key: value for key, value in row.items() if value != ""
+                }
+            return
+        for line, text in enumerate(file, 1):
+            if not text.strip():
+                continue
+            try:
+                yield line, json.loads(text)
+            except ValueError as error:
+                raise CommandError(f"{file.name}:{line}: {error}")
@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from posts.counters import recount_comments, recount_follows, recount_posts
+from posts.models import Post
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает число постов, подписчиков и подписок авторов "
+        "и комментариев постов."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Число объектов, пересчитываемых в одной транзакции.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        fixed_posts = self.recount(Post, recount_comments, batch_size)
+        fixed_authors = self.recount(User, recount_posts, batch_size)
+        fixed_follows = self.recount(User, recount_follows, batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f"Исправлено постов: {fixed_posts}, авторов: {fixed_authors}, "
+            f"подписок: {fixed_follows}"
+        ))
+
+    def recount(self, model, recount_batch, batch_size):
+        fixed = 0
+        last_pk = 0
+        while True:
+            ids = list(
+                model.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                return fixed
+            fixed += recount_batch(ids)
+            last_pk = ids[-1]
@@ -0,0 +1,250 @@
+import itertools
+import random
+import time
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+
+from faker import Faker
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from posts import counters, search
+from posts.cache import bump_feed_generation
+from posts.importer import keep_created
+from posts.models import Comment, Follow, Group, Post, TimelineEntry
+from posts.timeline import (
+    CELEBRITIES_CACHE_KEY, TIMELINE_BACKFILL_POSTS, get_celebrities
+)
+
+User = get_user_model()
+
+SEED_BATCH_SIZE = 5000
+SEED_SIZES = {
+    "users": 1000,
+    "groups": 20,
+    "posts": 20000,
+    "comments": 20000,
+    "follows": 20000,
+}
+TEXT_POOL_SIZE = 1000
+# Dates are counted back from a fixed moment so that runs are repeatable.
+SEED_END = datetime(2026, 1, 1, tzinfo=timezone.utc)
+SEED_PERIOD = timedelta(days=365)
+GROUPLESS_SHARE = 0.3
+UNUSABLE_PASSWORD = "!benchmark"
+
+
+def zipf_weights(size):
+    """Cumulative weights that make a few authors much more popular."""
+    return list(itertools.accumulate(1 / rank for rank in range(1, size + 1)))
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет базу воспроизводимым набором данных для замеров "
+        "производительности."
+    )
+
+    def add_arguments(self, parser):
+        for name, default in SEED_SIZES.items():
+            parser.add_argument(
+                f"--{name}",
+                type=int,
+                default=default,
+                help=f"Число создаваемых объектов {name}.",
+            )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=1,
+            help="Зерно генератора; одно зерно даёт одинаковые данные.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=SEED_BATCH_SIZE,
+            help="Число строк, записываемых в одной транзакции.",
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.prefix = f"bench{options['seed']}_"
+        if User.objects.filter(username__startswith=self.prefix).exists():
+            raise CommandError(
+                f"Данные с зерном {options['seed']} уже созданы"
+            )
+        fake = Faker("ru_RU")
+        fake.seed_instance(options["seed"])
+        self.texts = [
+            fake.text(max_nb_chars=300) for _ in range(TEXT_POOL_SIZE)
+        ]
+        self.first_post_id = self.next_id(Post)
+        self.first_follow_id = self.next_id(Follow)
+        for name in SEED_SIZES:
+            self.timed(name, getattr(self, f"seed_{name}"), options[name])
+        self.timed("counters", call_command, "recount_counters",
+                   stdout=self.stdout)
+        self.timed("search", self.index_posts)
+        self.timed("timelines", self.fill_timelines)
+        counters.forget_feed_counts()
+        bump_feed_generation()
+
+    def timed(self, stage, function, *args, **kwargs):
+        started = time.monotonic()
+        function(*args, **kwargs)
+        self.stdout.write(f"{stage}: {time.monotonic() - started:.1f} с")
+
+    def next_id(self, model):
+        return (model.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+
+    def created(self):
+        return SEED_END - self.rng.random() * SEED_PERIOD
+
+    def text(self):
+        return self.rng.choice(self.texts)
+
+    def insert_generated(self, model, total, make, **kwargs):
+        """Create ``total`` objects built by ``make`` batch by batch, so
+        only one batch is ever held in memory."""
+        dated = any(field.name == "created" for field in model._meta.fields)
+        for start in range(0, total, self.batch_size):
+            size = min(self.batch_size, total - start)
+            with transaction.atomic(), (
+                keep_created(model) if dated else nullcontext()
+            ):
+                model.objects.bulk_create(make(start, size), **kwargs)
+
+    def seed_users(self, total):
+        self.insert_generated(User, total, lambda start, size: [
+            User(username=f"{self.prefix}{number}",
+                 password=UNUSABLE_PASSWORD)
+            for number in range(start, start + size)
+        ])
+        self.user_ids = list(
+            User.objects.filter(username__startswith=self.prefix)
+            .order_by("id").values_list("id", flat=True)
+        )
+        self.author_weights = zipf_weights(len(self.user_ids))
+
+    def seed_groups(self, total):
+        self.insert_generated(Group, total, lambda start, size: [
+            Group(slug=f"{self.prefix}{number}".replace("_", "-"),
+                  title=f"Группа {number}",
+                  description=self.text())
+            for number in range(start, start + size)
+        ])
+        self.group_ids = list(
+            Group.objects.filter(
+                slug__startswith=self.prefix.replace("_", "-")
+            ).values_list("id", flat=True)
+        )
+
+    def authors(self, size):
+        return self.rng.choices(
+            self.user_ids, cum_weights=self.author_weights, k=size
+        )
+
+    def seed_posts(self, total):
+        self.post_ids = range(self.first_post_id, self.first_post_id + total)
+
+        def make(start, size):
+            return [
+                Post(
+                    id=self.first_post_id + start + offset,
+                    author_id=author_id,
+                    group_id=(
+                        None if not self.group_ids
+                        or self.rng.random() < GROUPLESS_SHARE
+                        else self.rng.choice(self.group_ids)
+                    ),
+                    text=self.text(),
+                    created=self.created(),
+                )
+                for offset, author_id in enumerate(self.authors(size))
+            ]
+
+        self.insert_generated(Post, total, make)
+
+    def seed_comments(self, total):
+        if not self.post_ids:
+            return
+        post_weights = zipf_weights(len(self.post_ids))
+
+        def make(start, size):
+            post_ids = self.rng.choices(
+                self.post_ids, cum_weights=post_weights, k=size
+            )
+            return [
+                Comment(
+                    post_id=post_id,
+                    author_id=self.rng.choice(self.user_ids),
+                    text=self.text(),
+                    created=self.created(),
+                )
+                for post_id in post_ids
+            ]
+
+        self.insert_generated(Comment, total, make)
+
+    def seed_follows(self, total):
+        def make(start, size):
+            pairs = {
+                (user_id, author_id)
+                for user_id, author_id in zip(
+                    self.rng.choices(self.user_ids, k=size),
+                    self.authors(size),
+                )
+                if user_id != author_id
+            }
+            return [
+                Follow(user_id=user_id, author_id=author_id)
+                for user_id, author_id in sorted(pairs)
+            ]
+
+        # Pairs repeated across batches are dropped by the unique
+        # constraint.
+        self.insert_generated(Follow, total, make, ignore_conflicts=True)
+
+    def index_posts(self):
+        for start in range(self.first_post_id, self.next_id(Post),
+                           self.batch_size):
+            with transaction.atomic():
+                search.index_posts(
+                    Post.objects.filter(
+                        id__gte=start, id__lt=start + self.batch_size
+                    ).values_list("id", "text")
+                )
+
+    def fill_timelines(self):
+        """Fan out the newest posts of followed authors in one statement.
+
+        Per-follow ``timeline.backfill`` costs several queries per row,
+        which is far too slow for millions of follows.
+        """
+        cache.delete(CELEBRITIES_CACHE_KEY)
+        celebrities = sorted(get_celebrities()) or [0]
+        placeholders = ", ".join(["%s"] * len(celebrities))
+        sql = f"""
+            INSERT INTO {TimelineEntry._meta.db_table}
+                (user_id, post_id, author_id, created)
+            SELECT user_id, post_id, author_id, created FROM (
+                SELECT f.user_id, p.id AS post_id, p.author_id, p.created,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY f.id ORDER BY p.created DESC
+                       ) AS number
+                FROM {Follow._meta.db_table} f
+                JOIN {Post._meta.db_table} p ON p.author_id = f.author_id
+                WHERE f.id >= %s
+                  AND f.author_id NOT IN ({placeholders})
+            ) WHERE number <= %s
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, [self.first_follow_id, *celebrities,
+                                 TIMELINE_BACKFILL_POSTS])
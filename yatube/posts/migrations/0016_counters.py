@@ -0,0 +1,53 @@
+# Generated by Django 2.2.16 on 2026-10-18 12:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    AuthorStats = apps.get_model("posts", "AuthorStats")
+    Comment = apps.get_model("posts", "Comment")
+    Post = apps.get_model("posts", "Post")
+    comments = Comment.objects.filter(
+        post_id=OuterRef("pk")
+    ).order_by().values("post_id").annotate(total=Count("id"))
+    Post.objects.update(
+        comments_count=Coalesce(Subquery(comments.values("total")), 0)
+    )
+    AuthorStats.objects.bulk_create(
+        AuthorStats(user_id=author_id, posts_count=total)
+        for author_id, total in Post.objects.order_by()
+        .values("author_id").annotate(total=Count("id"))
+        .values_list("author_id", "total")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0015_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Число постов')),
+            ],
+            options={
+                'verbose_name': 'Статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Число комментариев'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
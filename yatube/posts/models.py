@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from core.fields import FullTextField
 from core.models import ModelWithDateAndText
 
 User = get_user_model()
@@ -17,6 +18,25 @@ class Group(models.Model):
         return self.title
 
 
+class AuthorStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+        verbose_name="Автор",
+    )
+    posts_count = models.PositiveIntegerField("Число постов", default=0)
+    followers_count = models.PositiveIntegerField(
+        "Число подписчиков", default=0, db_index=True
+    )
+    following_count = models.PositiveIntegerField("Число подписок", default=0)
+
+    class Meta:
+        verbose_name = "Статистика автора"
+        verbose_name_plural = "Статистика авторов"
+
+
 class Post(ModelWithDateAndText):
     author = models.ForeignKey(
         User,
@@ -38,16 +58,65 @@ class Post(ModelWithDateAndText):
         upload_to="posts/",
         blank=True
     )
+    comments_count = models.PositiveIntegerField(
+        "Число комментариев",
+        default=0,
+        editable=False,
+    )
+
+    # Kept up to date with UPDATE ... SET x = x + 1; a full save of an
+    # instance loaded earlier must not write an old value back.
+    COUNTER_FIELDS = ("comments_count",)
 
     def __str__(self):
         return self.text[:CHARS_OF_POST_TEXT]
 
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None and not self._state.adding:
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, update_fields=update_fields, **kwargs)
+
     class Meta:
         ordering = ["-created"]
+        indexes = [
+            models.Index(
+                fields=["-created", "-id"], name="post_created_id"
+            ),
+            models.Index(
+                fields=["author", "-created", "-id"],
+                name="post_author_created",
+            ),
+            models.Index(
+                fields=["group", "-created", "-id"],
+                name="post_group_created",
+            ),
+        ]
         verbose_name = "Пост"
         verbose_name_plural = "Посты"
 
 
+class PostSearch(models.Model):
+    """Row of the ``posts_post_fts`` FTS5 table that mirrors ``Post.text``."""
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        db_column="rowid",
+        related_name="search",
+        verbose_name="Пост",
+    )
+    text = FullTextField("Текст")
+
+    class Meta:
+        managed = False
+        db_table = "posts_post_fts"
+
+
 class Comment(ModelWithDateAndText):
     post = models.ForeignKey(
         Post,
@@ -65,6 +134,15 @@ class Comment(ModelWithDateAndText):
     def __str__(self):
         return self.text[:CHARS_OF_COMMENT_TEXT]
 
+    class Meta:
+        ordering = ["created"]
+        indexes = [
+            models.Index(
+                fields=["post", "created", "id"],
+                name="comment_post_created",
+            ),
+        ]
+
 
 class Follow(models.Model):
     user = models.ForeignKey(
@@ -73,9 +151,63 @@ class Follow(models.Model):
         related_name="follower",
         verbose_name="Подписчик",
     )
-    author = models.OneToOneField(
+    author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name="following",
         verbose_name="Автор",
     )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "author"], name="unique_follow"
+            ),
+        ]
+        # Follower and following lists are paginated newest first.
+        indexes = [
+            models.Index(fields=["author", "-id"], name="follow_author_id"),
+            models.Index(fields=["user", "-id"], name="follow_user_id"),
+        ]
+        verbose_name = "Подписка"
+        verbose_name_plural = "Подписки"
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="timeline",
+        verbose_name="Подписчик",
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+        verbose_name="Пост",
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Автор",
+    )
+    created = models.DateTimeField("Дата создания поста")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "post"], name="unique_timeline_entry"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-created", "-id"],
+                name="timeline_user_created",
+            ),
+            models.Index(
+                fields=["user", "author"], name="timeline_user_author"
+            ),
+        ]
+        verbose_name = "Запись ленты"
+        verbose_name_plural = "Записи ленты"
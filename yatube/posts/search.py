@@ -0,0 +1,54 @@
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import Post, PostSearch
+
+MAX_SEARCH_WORDS = 10
+WORD_RE = re.compile(r"\w+")
+
+
+def normalize(text):
+    return text.lower().replace("ё", "е")
+
+
+def build_match(query):
+    """Turn user input into an FTS5 query matching every word by prefix.
+
+    ``unicode61`` has no Russian stemmer, so prefix queries are what lets
+    «кот» find «котики» and «котом».
+    """
+    words = WORD_RE.findall(normalize(query))[:MAX_SEARCH_WORDS]
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def filter_posts(query, queryset=None):
+    match = build_match(query)
+    if not match:
+        return None
+    if queryset is None:
+        queryset = Post.objects.all()
+    return queryset.filter(search__text__match=match)
+
+
+def search_posts(query, queryset=None):
+    posts = filter_posts(query, queryset)
+    if posts is None:
+        return None
+    table = connection.ops.quote_name(PostSearch._meta.db_table)
+    return posts.annotate(rank=RawSQL(f"bm25({table})", ()))
+
+
+def index_posts(posts):
+    """Index ``(id, text)`` pairs of posts with one batch of statements."""
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {PostSearch._meta.db_table}"
+            "(rowid, text) VALUES (%s, %s)",
+            [(post_id, normalize(text)) for post_id, text in posts],
+        )
+
+
+def index_post(post):
+    index_posts([(post.pk, post.text)])
@@ -0,0 +1,150 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import counters, search, thumbnails, timeline
+from .cache import bump_feed_generation
+from .cards import bump_card_versions
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, **kwargs):
+    if created:
+        timeline.fan_out(instance)
+
+
+@receiver(post_save, sender=Post)
+def increment_posts_count(sender, instance, created, **kwargs):
+    if created:
+        counters.change_posts_count(instance.author_id, 1)
+
+
+@receiver(post_save, sender=Post)
+def index_post_text(sender, instance, **kwargs):
+    search.index_post(instance)
+
+
+@receiver(post_init, sender=Post)
+def remember_image(sender, instance, **kwargs):
+    # Read the raw attribute so that deferred images are not loaded.
+    image = instance.__dict__.get("image")
+    instance._saved_image = getattr(image, "name", image)
+
+
+@receiver(post_init, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    instance._saved_group_id = instance.__dict__.get("group_id")
+
+
+@receiver(post_save, sender=Post)
+def change_feed_counts(sender, instance, created, **kwargs):
+    if created:
+        counters.change_feed_counts(instance.group_id, 1)
+    elif instance._saved_group_id != instance.group_id:
+        counters.move_group_count(
+            instance._saved_group_id, instance.group_id
+        )
+    instance._saved_group_id = instance.group_id
+
+
+@receiver(post_save, sender=Post)
+def pregenerate_thumbnails(sender, instance, **kwargs):
+    name = instance.image.name
+    if instance._saved_image and instance._saved_image != name:
+        thumbnails.delete_thumbnails(instance._saved_image)
+    instance._saved_image = name
+    if name:
+        transaction.on_commit(lambda: thumbnails.schedule_thumbnails(name))
+
+
+@receiver(post_delete, sender=Post)
+def drop_thumbnails(sender, instance, **kwargs):
+    thumbnails.delete_thumbnails(instance.image.name)
+
+
+@receiver(post_delete, sender=Post)
+def decrement_posts_count(sender, instance, **kwargs):
+    counters.change_posts_count(instance.author_id, -1)
+    counters.change_feed_counts(instance.group_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+def increment_comments_count(sender, instance, created, **kwargs):
+    if created:
+        counters.change_comments_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comments_count(sender, instance, **kwargs):
+    counters.change_comments_count(instance.post_id, -1)
+
+
+# Registered before the timeline receivers, which read followers_count.
+@receiver(post_save, sender=Follow)
+def increment_follow_counts(sender, instance, created, **kwargs):
+    if created:
+        counters.change_follow_counts(
+            instance.user_id, instance.author_id, 1
+        )
+
+
+@receiver(post_delete, sender=Follow)
+def decrement_follow_counts(sender, instance, **kwargs):
+    counters.change_follow_counts(instance.user_id, instance.author_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, **kwargs):
+    if created:
+        timeline.backfill(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def trim_timeline(sender, instance, **kwargs):
+    timeline.trim(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Group)
+# Deleting a group moves its posts out of it.
+@receiver(post_delete, sender=Group)
+# Anonymous profile pages show follower counts.
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_feed_cache(sender, **kwargs):
+    bump_feed_generation()
+    # Pages rendered before the commit were cached under the new
+    # generation with the old rows; drop them too.
+    transaction.on_commit(bump_feed_generation)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_card(sender, instance, **kwargs):
+    bump_card_versions("post", [instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_commented_post_card(sender, instance, **kwargs):
+    # Cards show the number of comments.
+    bump_card_versions("post", [instance.post_id])
+
+
+@receiver(post_save, sender=Group)
+def invalidate_group_cards(sender, instance, **kwargs):
+    bump_card_versions("group", [instance.pk])
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_cards(sender, instance, update_fields=None, **kwargs):
+    if update_fields == {"last_login"}:
+        return
+    bump_card_versions("author", [instance.pk])
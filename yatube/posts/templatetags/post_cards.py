@@ -0,0 +1,10 @@
+from django import template
+
+from ..cards import CARD_TEMPLATE, render_cards
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(posts, template_name=CARD_TEMPLATE):
+    return render_cards(posts, template_name)
@@ -0,0 +1,11 @@
+from django import template
+
+from ..thumbnails import get_image_sources
+
+register = template.Library()
+
+
+@register.inclusion_tag("posts/includes/post_image.html")
+def post_image(post):
+    url, sources = get_image_sources(post.image)
+    return {"url": url, "sources": sources}
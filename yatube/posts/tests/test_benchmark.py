@@ -0,0 +1,69 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+
+from ..models import AuthorStats, Comment, Follow, Post, TimelineEntry
+
+
+class BenchmarkCommandsTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_seed_and_benchmark(self):
+        """Проверка заполнения базы и записи результатов замеров."""
+        call_command(
+            "seed_benchmark", users=5, groups=2, posts=30, comments=20,
+            follows=10, batch_size=7, stdout=StringIO(),
+        )
+        self.assertEqual(Post.objects.count(), 30)
+        self.assertEqual(Comment.objects.count(), 20)
+        self.assertEqual(
+            sum(AuthorStats.objects.values_list("posts_count", flat=True)),
+            30,
+        )
+        self.assertTrue(Follow.objects.exists())
+        self.assertTrue(TimelineEntry.objects.exists())
+        output = os.path.join(self.directory, "results.json")
+        call_command("benchmark_views", iterations=2, output=output,
+                     stdout=StringIO())
+        with open(output, encoding="utf-8") as results_file:
+            report = json.load(results_file)
+        self.assertEqual(report["meta"]["dataset"]["Post"], 30)
+        index = next(
+            result for result in report["results"]
+            if result["name"] == "posts:index"
+            and result["client"] == "anonymous"
+        )
+        self.assertEqual(index["status"], 200)
+        self.assertIn("p99", index["latency_ms"])
+        self.assertGreater(index["cold_queries"], 0)
+        self.assertGreater(index["peak_memory_kb"], 0)
+
+
+class ConcurrencyBenchmarkTests(TransactionTestCase):
+    def test_engines_are_compared(self):
+        """Проверка замера пропускной способности обоих бэкендов."""
+        call_command(
+            "seed_benchmark", users=5, groups=1, posts=20, comments=5,
+            follows=5, stdout=StringIO(),
+        )
+        output = StringIO()
+        call_command(
+            "benchmark_concurrency", workers=1, threads=2, seconds=0.3,
+            stdout=output, stderr=StringIO(),
+        )
+        results = json.loads(output.getvalue())["results"]
+        self.assertEqual(
+            [result["engine"] for result in results], ["stock", "tuned"]
+        )
+        for result in results:
+            with self.subTest(engine=result["engine"]):
+                self.assertGreater(result["reads_per_second"], 0)
+                self.assertEqual(result["errors"], 0)
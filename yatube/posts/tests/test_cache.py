@@ -1,10 +1,14 @@
 from faker import Faker
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.urls import reverse
 
-from ..models import Post
+from ..cache import get_feed_generation
+from ..models import Group, Post
+from ..views import POSTS_PER_PAGE
+from .utils import run_on_commit
 
 User = get_user_model()
 
@@ -17,20 +21,73 @@ class PostViewsTests(TestCase):
         cls.user = User.objects.create_user(
             username=fake.name(),
         )
+        cls.group = Group.objects.create(
+            title=fake.word(),
+            slug=fake.slug(),
+        )
         cls.post = Post.objects.create(
             id=fake.random_int(),
             author=cls.user,
+            group=cls.group,
             text=fake.text(),
         )
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
 
     def test_index_content_saved_in_cache(self):
         """Проверка сохранения постов index в кэше"""
         response = self.guest_client.get(reverse("posts:index"))
         index_post = response.content
-        Post.objects.filter(id=self.post.id).delete()
+        Post.objects.filter(id=self.post.id).update(text="Новый текст")
         response = self.guest_client.get(reverse("posts:index"))
         index_post_2 = response.content
         self.assertEqual(index_post, index_post_2)
+
+    def test_feed_caches_invalidated_on_post_changes(self):
+        """Проверка сброса кэша index, group_list и profile при изменении
+        и удалении поста."""
+        pages = [
+            reverse("posts:index"),
+            reverse("posts:group_list", kwargs={"slug": self.group.slug}),
+            reverse("posts:profile", kwargs={"username": self.user}),
+        ]
+        for page in pages:
+            self.guest_client.get(page)
+        post = Post.objects.get(id=self.post.id)
+        post.text = "Отредактированный текст"
+        post.save()
+        for page in pages:
+            with self.subTest(page=page):
+                response = self.guest_client.get(page)
+                self.assertContains(response, post.text)
+        post.delete()
+        for page in pages:
+            with self.subTest(page=page):
+                response = self.guest_client.get(page)
+                self.assertNotContains(response, post.text)
+
+    def test_index_cache_varies_on_page(self):
+        """Проверка, что разные страницы index кэшируются отдельно."""
+        for i in range(POSTS_PER_PAGE):
+            Post.objects.create(author=self.user, text=f"Пост {i}")
+        first_page = self.guest_client.get(reverse("posts:index"))
+        second_page = self.guest_client.get(
+            reverse("posts:index"),
+            {"cursor": first_page.context["page_obj"].next_cursor},
+        )
+        self.assertNotEqual(first_page.content, second_page.content)
+        self.assertContains(second_page, self.post.text)
+
+    def test_generation_changes_after_commit(self):
+        """Проверка смены поколения кэша после фиксации транзакции,
+        в том числе при удалении группы."""
+        with run_on_commit():
+            Post.objects.create(author=self.user, text="Новый пост")
+            generation = get_feed_generation()
+        self.assertNotEqual(get_feed_generation(), generation)
+        group = Group.objects.create(title="Удаляемая", slug="deleted")
+        generation = get_feed_generation()
+        group.delete()
+        self.assertNotEqual(get_feed_generation(), generation)
@@ -0,0 +1,74 @@
+from faker import Faker
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..cards import render_cards
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class PostCardsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        fake = Faker()
+        cls.user = User.objects.create_user(
+            username=fake.user_name(),
+        )
+        cls.group = Group.objects.create(
+            title=fake.word(),
+            slug=fake.slug(),
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text=fake.text(),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def render(self):
+        posts = Post.objects.select_related("author", "group").filter(
+            id=self.post.id
+        )
+        return str(render_cards(posts)[0][1])
+
+    def test_card_reused_until_post_changes(self):
+        """Проверка повторного использования карточки и её сброса
+        при изменении поста."""
+        card = self.render()
+        Post.objects.filter(id=self.post.id).update(text="Без сигналов")
+        self.assertEqual(self.render(), card)
+        post = Post.objects.get(id=self.post.id)
+        post.text = "Отредактированный текст"
+        post.save()
+        self.assertIn(post.text, self.render())
+
+    def test_card_invalidated_on_author_group_and_comment(self):
+        """Проверка сброса карточки при изменении автора, группы
+        и комментариев."""
+        self.render()
+        self.user.first_name = "Переименованный"
+        self.user.save()
+        self.assertIn(self.user.first_name, self.render())
+        self.group.title = "Новая группа"
+        self.group.save()
+        self.assertIn(self.group.title, self.render())
+        card = self.render()
+        Comment.objects.create(post=self.post, author=self.user, text="К")
+        self.assertNotEqual(self.render(), card)
+
+    def test_card_shared_between_feeds(self):
+        """Проверка, что карточка отрисовывается один раз для всех лент."""
+        self.render()
+        posts = list(
+            Post.objects.select_related("author", "group").filter(
+                id=self.post.id
+            )
+        )
+        with self.assertTemplateNotUsed("posts/includes/post_list.html"):
+            render_cards(posts)
@@ -0,0 +1,82 @@
+from io import StringIO
+
+from faker import Faker
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..models import AuthorStats, Post, Comment
+
+User = get_user_model()
+
+POSTS_FOR_TESTS = 3
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        fake = Faker()
+        cls.user = User.objects.create_user(
+            username=fake.user_name(),
+        )
+        cls.posts = [
+            Post.objects.create(author=cls.user, text=fake.text())
+            for i in range(POSTS_FOR_TESTS)
+        ]
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_posts_count_follows_creation_and_deletion(self):
+        """Проверка счётчика постов автора при создании и удалении."""
+        self.assertEqual(self.user.stats.posts_count, POSTS_FOR_TESTS)
+        self.authorized_client.post(
+            reverse("posts:post_create"), {"text": "Новый пост"}
+        )
+        Post.objects.filter(pk=self.posts[0].pk).delete()
+        response = self.authorized_client.get(
+            reverse("posts:profile", kwargs={"username": self.user})
+        )
+        self.assertEqual(response.context["posts_count"], POSTS_FOR_TESTS)
+
+    def test_comments_count_follows_creation_and_deletion(self):
+        """Проверка счётчика комментариев при создании и удалении."""
+        post = self.posts[0]
+        self.authorized_client.post(
+            reverse("posts:add_comment", kwargs={"post_id": post.pk}),
+            {"text": "Комментарий"},
+        )
+        Comment.objects.create(post=post, author=self.user)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 2)
+        Comment.objects.filter(post=post).first().delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+
+    def test_stale_post_save_keeps_comments_count(self):
+        """Проверка, что сохранение устаревшего поста не затирает
+        счётчик комментариев."""
+        post = Post.objects.get(pk=self.posts[0].pk)
+        Comment.objects.create(post=post, author=self.user, text="Первый")
+        post.text = "Отредактированный текст"
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+
+    def test_recount_counters_repairs_drift(self):
+        """Проверка исправления расхождений командой recount_counters."""
+        post = self.posts[0]
+        Comment.objects.create(post=post, author=self.user)
+        Post.objects.filter(pk=post.pk).update(comments_count=10)
+        AuthorStats.objects.filter(user=self.user).delete()
+        call_command("recount_counters", batch_size=2, stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).posts_count,
+            POSTS_FOR_TESTS,
+        )
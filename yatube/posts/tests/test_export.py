@@ -0,0 +1,103 @@
+import json
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from zipfile import ZipFile
+
+from faker import Faker
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from ..export import EXPORT_DATA_NAME, EXPORT_IMAGES_DIR
+from ..models import Comment, Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        fake = Faker()
+        cls.user = User.objects.create_user(username=fake.user_name())
+        cls.another_user = User.objects.create_user(
+            username=fake.user_name()
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text=fake.text(),
+            image=SimpleUploadedFile(
+                name="small.gif", content=SMALL_GIF, content_type="image/gif"
+            ),
+        )
+        Post.objects.create(author=cls.another_user, text=fake.text())
+        cls.comment = Comment.objects.create(
+            post=cls.post, author=cls.user, text=fake.text()
+        )
+        cls.url = reverse("posts:profile_export",
+                          kwargs={"username": cls.user.username})
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def read_rows(self, content):
+        return [json.loads(line) for line in content.decode().splitlines()]
+
+    def test_ndjson_export_streams_users_data(self):
+        """Проверка выгрузки постов и комментариев автора в NDJSON."""
+        response = self.authorized_client.get(self.url)
+        self.assertTrue(response.streaming)
+        rows = self.read_rows(b"".join(response.streaming_content))
+        self.assertEqual([row["model"] for row in rows],
+                         ["user", "post", "comment"])
+        self.assertEqual(rows[1]["id"], self.post.id)
+        self.assertEqual(rows[1]["image_url"], self.post.image.url)
+        self.assertEqual(rows[2]["text"], self.comment.text)
+
+    def test_zip_export_contains_images(self):
+        """Проверка выгрузки данных и картинок в zip."""
+        response = self.authorized_client.get(self.url, {"format": "zip"})
+        archive = ZipFile(BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(len(self.read_rows(archive.read(EXPORT_DATA_NAME))),
+                         3)
+        self.assertEqual(
+            archive.read(EXPORT_IMAGES_DIR + self.post.image.name),
+            SMALL_GIF,
+        )
+
+    def test_export_of_another_user_is_forbidden(self):
+        """Проверка запрета выгрузки чужих данных."""
+        client = Client()
+        client.force_login(self.another_user)
+        self.assertEqual(client.get(self.url).status_code, 403)
+
+    def test_export_command_writes_file(self):
+        """Проверка выгрузки данных командой."""
+        output = os.path.join(TEMP_MEDIA_ROOT, "export.ndjson")
+        call_command("export_yatube", self.user.username, output=output)
+        with open(output, "rb") as export:
+            self.assertEqual(len(self.read_rows(export.read())), 3)
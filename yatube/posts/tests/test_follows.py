@@ -0,0 +1,120 @@
+from io import StringIO
+
+from faker import Faker
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..models import AuthorStats, Follow
+from ..views import FOLLOWS_PER_PAGE
+
+User = get_user_model()
+
+
+class FollowTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        fake = Faker()
+        cls.user = User.objects.create_user(
+            username=fake.user_name(),
+        )
+        cls.another_user = User.objects.create_user(
+            username=f"{fake.user_name()}2",
+        )
+        cls.author = User.objects.create_user(
+            username=f"{fake.user_name()}3",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def follow(self, client, author):
+        return client.get(
+            reverse("posts:profile_follow",
+                    kwargs={"username": author.username})
+        )
+
+    def test_follow_is_idempotent_and_counted(self):
+        """Проверка повторной подписки и счётчиков подписок."""
+        self.follow(self.authorized_client, self.author)
+        response = self.follow(self.authorized_client, self.author)
+        self.assertRedirects(response, reverse("posts:follow_index"))
+        another_client = Client()
+        another_client.force_login(self.another_user)
+        self.follow(another_client, self.author)
+        self.assertEqual(Follow.objects.filter(author=self.author).count(), 2)
+        response = self.authorized_client.get(
+            reverse("posts:profile", kwargs={"username": self.author})
+        )
+        self.assertEqual(response.context["followers_count"], 2)
+        self.assertEqual(self.user.stats.following_count, 1)
+        self.authorized_client.get(
+            reverse("posts:profile_unfollow",
+                    kwargs={"username": self.author.username})
+        )
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.author).followers_count, 1
+        )
+
+    def test_anonymous_profile_shows_new_follower(self):
+        """Проверка обновления закэшированного профиля после подписки."""
+        profile_url = reverse(
+            "posts:profile", kwargs={"username": self.author}
+        )
+        response = self.client.get(profile_url)
+        self.assertEqual(response.context["followers_count"], 0)
+        self.follow(self.authorized_client, self.author)
+        response = self.client.get(profile_url)
+        self.assertIsNotNone(response.context)
+        self.assertEqual(response.context["followers_count"], 1)
+
+    def test_recount_counters_repairs_follow_counts(self):
+        """Проверка пересчёта числа подписчиков и подписок."""
+        Follow.objects.bulk_create([
+            Follow(user=self.user, author=self.author),
+            Follow(user=self.another_user, author=self.author),
+        ])
+        call_command("recount_counters", stdout=StringIO())
+        stats = AuthorStats.objects.get(user=self.author)
+        self.assertEqual(stats.followers_count, 2)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).following_count, 1
+        )
+
+    def test_follow_lists_are_paginated_by_cursor(self):
+        """Проверка страниц подписчиков и подписок."""
+        followers = User.objects.bulk_create([
+            User(username=f"follower{number}")
+            for number in range(FOLLOWS_PER_PAGE + 1)
+        ])
+        Follow.objects.bulk_create([
+            Follow(user=follower, author=self.author)
+            for follower in User.objects.filter(
+                username__in=[follower.username for follower in followers]
+            ).order_by("id")
+        ])
+        url = reverse("posts:profile_followers",
+                      kwargs={"username": self.author.username})
+        response = self.authorized_client.get(url)
+        page_obj = response.context["page_obj"]
+        self.assertEqual(len(response.context["users"]), FOLLOWS_PER_PAGE)
+        self.assertEqual(response.context["users"][0].username,
+                         f"follower{FOLLOWS_PER_PAGE}")
+        response = self.authorized_client.get(
+            url, {"cursor": page_obj.next_cursor}
+        )
+        self.assertEqual(
+            [user.username for user in response.context["users"]],
+            ["follower0"],
+        )
+        response = self.authorized_client.get(
+            reverse("posts:profile_following",
+                    kwargs={"username": "follower0"})
+        )
+        self.assertEqual(response.context["users"], [self.author])
@@ -0,0 +1,96 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from ..models import AuthorStats, Comment, Follow, Group, Post, TimelineEntry
+from ..search import filter_posts
+
+User = get_user_model()
+
+ROWS = [
+    {"model": "user", "username": "leo", "first_name": "Лев"},
+    {"model": "user", "username": "sonya"},
+    {"model": "group", "slug": "novels", "title": "Романы"},
+    {"model": "post", "id": 101, "author": "leo", "group": "novels",
+     "text": "Все счастливые семьи похожи друг на друга",
+     "created": "1877-01-01T00:00:00"},
+    {"model": "post", "id": 102, "author": "leo",
+     "text": "Война и мир", "created": "1869-01-01T00:00:00"},
+    {"model": "comment", "post": 101, "author": "sonya", "text": "Согласна"},
+    {"model": "comment", "post": 101, "author": "nobody", "text": "?"},
+    {"model": "follow", "user": "sonya", "author": "leo"},
+]
+
+POSTS_CSV = (
+    "id,author,group,text\n"
+    "103,leo,,Анна Каренина\n"
+)
+
+
+class ImportCommandTests(TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp(dir=settings.BASE_DIR))
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def write(self, name, content):
+        path = self.directory / name
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
+    def import_rows(self, *paths, **options):
+        output = StringIO()
+        call_command("import_yatube", *paths, stdout=output, **options)
+        return output.getvalue()
+
+    def test_import_creates_objects_and_derived_data(self):
+        """Проверка загрузки объектов и пересчёта производных данных."""
+        jsonl = self.write(
+            "legacy.jsonl", "\n".join(json.dumps(row) for row in ROWS)
+        )
+        output = self.import_rows(jsonl, batch_size=2)
+        self.assertIn("строк/с", output)
+        self.assertIn("comment: загружено 1, пропущено 1", output)
+        leo = User.objects.get(username="leo")
+        post = Post.objects.get(id=101)
+        self.assertEqual(post.group, Group.objects.get(slug="novels"))
+        self.assertEqual(post.created.year, 1877)
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(AuthorStats.objects.get(user=leo).posts_count, 2)
+        self.assertEqual(list(filter_posts("счастлив")), [post])
+        self.assertTrue(Follow.objects.filter(author=leo).exists())
+        self.assertEqual(
+            TimelineEntry.objects.filter(user__username="sonya").count(), 2
+        )
+
+    def test_import_is_repeatable_and_reads_csv(self):
+        """Проверка повторной загрузки и загрузки постов из CSV."""
+        jsonl = self.write(
+            "legacy.jsonl", "\n".join(json.dumps(row) for row in ROWS)
+        )
+        self.import_rows(jsonl)
+        output = self.import_rows(
+            jsonl, self.write("posts.csv", POSTS_CSV), model="post"
+        )
+        self.assertIn("post: загружено 1, пропущено 2", output)
+        self.assertIn("user: загружено 0, пропущено 2", output)
+        self.assertIn("follow: загружено 0, пропущено 1", output)
+        self.assertEqual(User.objects.filter(username="leo").count(), 1)
+        self.assertEqual(Comment.objects.filter(post_id=101).count(), 2)
+        self.assertEqual(Post.objects.get(id=103).group, None)
+        self.assertEqual(
+            AuthorStats.objects.get(user__username="leo").posts_count, 3
+        )
+
+    def test_broken_input_is_reported(self):
+        """Проверка сообщения о некорректной строке."""
+        path = self.write("broken.jsonl", '{"model": "post", "id": 1}\n')
+        with self.assertRaisesMessage(CommandError, "нет поля"):
+            self.import_rows(path)
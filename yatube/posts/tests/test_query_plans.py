@@ -0,0 +1,83 @@
+from faker import Faker
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Post, Group, Comment, Follow
+
+User = get_user_model()
+
+POSTS_FOR_TESTS = 30
+FEED_TABLES = ("posts_post", "posts_comment", "posts_timelineentry")
+
+
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        fake = Faker()
+        cls.user = User.objects.create_user(
+            username=fake.user_name(),
+        )
+        cls.author = User.objects.create_user(
+            username=fake.user_name() + "_author",
+        )
+        cls.group = Group.objects.create(
+            slug=fake.slug(),
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        for i in range(POSTS_FOR_TESTS):
+            cls.post = Post.objects.create(
+                author=cls.author if i % 2 else cls.user,
+                group=cls.group if i % 3 else None,
+                text=fake.text(),
+            )
+        Comment.objects.create(post=cls.post, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def get_query_plans(self, url):
+        with CaptureQueriesContext(connection) as context:
+            self.authorized_client.get(url)
+        plans = {}
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                sql = query["sql"]
+                if not sql.startswith("SELECT") or not any(
+                    f'FROM "{table}"' in sql for table in FEED_TABLES
+                ):
+                    continue
+                cursor.execute("EXPLAIN QUERY PLAN " + sql)
+                plans[sql] = [row[-1] for row in cursor.fetchall()]
+        return plans
+
+    def test_feed_views_use_indexes_instead_of_sorting(self):
+        """Проверка, что ленты и комментарии читаются по индексам без
+        сортировки всей таблицы."""
+        urls = [
+            reverse("posts:index"),
+            reverse("posts:index") + "?page=2",
+            reverse("posts:group_list", kwargs={"slug": self.group.slug}),
+            reverse("posts:profile", kwargs={"username": self.author}),
+            reverse("posts:post_detail", kwargs={"post_id": self.post.id}),
+            reverse("posts:follow_index"),
+        ]
+        for url in urls:
+            plans = self.get_query_plans(url)
+            self.assertTrue(plans, url)
+            for sql, plan in plans.items():
+                with self.subTest(url=url, sql=sql):
+                    details = " | ".join(plan)
+                    self.assertNotIn("TEMP B-TREE", details)
+                    for line in plan:
+                        self.assertFalse(
+                            line.startswith("SCAN") and "INDEX" not in line,
+                            details,
+                        )
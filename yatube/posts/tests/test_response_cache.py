@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+from faker import Faker
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import (
+    Client, RequestFactory, SimpleTestCase, TestCase, override_settings,
+)
+from django.urls import reverse
+from django.utils.http import http_date
+
+from core.replicas import ReplicaRouter, reading_from_replicas
+
+from ..cache import anonymous_response_cache
+from ..models import Group, Post, Comment
+
+User = get_user_model()
+
+
+class AnonymousResponseCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        fake = Faker()
+        cls.user = User.objects.create_user(
+            username=fake.user_name(),
+        )
+        cls.group = Group.objects.create(
+            title=fake.word(),
+            slug=fake.slug(),
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text=fake.text(),
+        )
+        cls.urls = [
+            reverse("posts:index"),
+            reverse("posts:group_list", kwargs={"slug": cls.group.slug}),
+            reverse("posts:profile", kwargs={"username": cls.user}),
+            reverse("posts:post_detail", kwargs={"post_id": cls.post.id}),
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_repeat_requests_get_not_modified(self):
+        """Проверка ответа 304 анониму только по ETag."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertIn("Cookie", response["Vary"])
+                etag_response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=response["ETag"]
+                )
+                self.assertEqual(
+                    etag_response.status_code, HTTPStatus.NOT_MODIFIED
+                )
+                self.assertFalse(response.has_header("Last-Modified"))
+                date_response = self.guest_client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=http_date()
+                )
+                self.assertEqual(date_response.status_code, HTTPStatus.OK)
+
+    def test_writes_change_etag(self):
+        """Проверка смены ETag после нового комментария."""
+        url = reverse("posts:post_detail", kwargs={"post_id": self.post.id})
+        etag = self.guest_client.get(url)["ETag"]
+        Comment.objects.create(post=self.post, author=self.user, text="Ещё")
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, "Ещё")
+
+    def test_authorized_responses_are_not_cached(self):
+        """Проверка, что ответы авторизованному пользователю не кэшируются."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertFalse(response.has_header("ETag"))
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaResponseCacheTests(SimpleTestCase):
+    def test_cached_responses_are_rendered_from_primary(self):
+        """Проверка, что ответ для кэша читается с основной базы."""
+        @anonymous_response_cache
+        def view(request):
+            return HttpResponse(ReplicaRouter().db_for_read(Post))
+
+        cache.clear()
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        with reading_from_replicas():
+            self.assertEqual(view(request).content, b"default")
+            self.assertEqual(view(request).content, b"default")
@@ -0,0 +1,90 @@
+from faker import Faker
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..models import Post, PostSearch
+from ..views import POSTS_PER_PAGE
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        fake = Faker()
+        cls.user = User.objects.create_user(
+            username=fake.user_name(),
+        )
+        cls.admin = User.objects.create_superuser(
+            username=fake.user_name() + "_admin",
+            email=fake.email(),
+            password=fake.password(),
+        )
+        cls.cat_post = Post.objects.create(
+            author=cls.user,
+            text="Котики и кошки: котики спят весь день",
+        )
+        cls.dog_post = Post.objects.create(
+            author=cls.user,
+            text="Собака увидела КОТА",
+        )
+        Post.objects.create(author=cls.user, text=fake.text())
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def search(self, query, **params):
+        return self.guest_client.get(
+            reverse("posts:search"), {"q": query, **params}
+        )
+
+    def test_search_matches_prefix_case_insensitive_and_ranked(self):
+        """Проверка поиска по началу слова без учёта регистра
+        и сортировки по релевантности."""
+        response = self.search("кот")
+        self.assertEqual(
+            list(response.context["page_obj"]),
+            [self.cat_post, self.dog_post],
+        )
+
+    def test_search_index_follows_edits_and_deletion(self):
+        """Проверка обновления индекса при изменении и удалении поста."""
+        post = Post.objects.get(pk=self.dog_post.pk)
+        post.text = "Собака увидела ёжика"
+        post.save()
+        self.assertNotIn(post, self.search("кот").context["page_obj"])
+        self.assertIn(post, self.search("ежик").context["page_obj"])
+        post.delete()
+        self.assertFalse(PostSearch.objects.filter(pk=post.pk).exists())
+
+    def test_search_results_are_cursor_paginated(self):
+        """Проверка курсорной пагинации результатов поиска."""
+        for i in range(POSTS_PER_PAGE):
+            Post.objects.create(author=self.user, text=f"Котёнок номер {i}")
+        first = self.search("кот")
+        self.assertContains(first, "q=%D0%BA%D0%BE%D1%82&amp;cursor=")
+        second = self.search("кот", cursor=first.context["page_obj"]
+                             .next_cursor)
+        results = list(first.context["page_obj"]) + list(
+            second.context["page_obj"]
+        )
+        self.assertEqual(len(set(results)), POSTS_PER_PAGE + 2)
+
+    def test_empty_query_shows_only_form(self):
+        """Проверка страницы поиска без запроса."""
+        response = self.search(" ,. ")
+        self.assertNotIn("page_obj", response.context)
+
+    def test_admin_search_uses_full_text_index(self):
+        """Проверка поиска по тексту постов в админке."""
+        client = Client()
+        client.force_login(self.admin)
+        response = client.get(
+            reverse("admin:posts_post_changelist"), {"q": "котики"}
+        )
+        self.assertEqual(
+            list(response.context["cl"].result_list), [self.cat_post]
+        )
@@ -0,0 +1,169 @@
+import shutil
+import tempfile
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO, StringIO
+from unittest import mock
+
+from faker import Faker
+from PIL import Image
+from sorl.thumbnail import default
+from sorl.thumbnail.images import ImageFile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from .. import thumbnails
+from ..models import Post
+from ..thumbnails import (
+    _thumbnails_ready, generate_thumbnails, get_image_sources,
+    get_image_url, thumbnails_ready,
+)
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        fake = Faker()
+        cls.user = User.objects.create_user(
+            username=fake.user_name(),
+        )
+        image = BytesIO()
+        Image.new("RGB", (40, 20), "red").save(image, "JPEG")
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text=fake.text(),
+            image=SimpleUploadedFile(
+                name="red.jpg",
+                content=image.getvalue(),
+                content_type="image/jpeg",
+            ),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        default.kvstore.clear()
+        self.guest_client = Client()
+
+    def test_feed_falls_back_to_original_image(self):
+        """Проверка вывода исходной картинки, пока миниатюры нет."""
+        response = self.guest_client.get(reverse("posts:index"))
+        self.assertContains(response, f'src="{self.post.image.url}"')
+
+    def test_feed_shows_generated_thumbnail(self):
+        """Проверка вывода миниатюры после её фоновой генерации."""
+        names, created = generate_thumbnails(self.post.image.name)
+        name = names[0]
+        self.assertTrue(created)
+        self.assertEqual(generate_thumbnails(self.post.image.name),
+                         (names, False))
+        self.assertNotEqual(get_image_url(self.post.image),
+                            self.post.image.url)
+        response = self.guest_client.get(
+            reverse("posts:post_detail", kwargs={"post_id": self.post.id})
+        )
+        self.assertContains(response, name)
+
+    def test_thumbnails_dropped_when_image_changes(self):
+        """Проверка удаления миниатюр при замене картинки поста."""
+        name = generate_thumbnails(self.post.image.name)[0][0]
+        post = Post.objects.get(pk=self.post.pk)
+        post.image = SimpleUploadedFile(
+            name="other.gif", content=SMALL_GIF, content_type="image/gif"
+        )
+        post.save()
+        self.assertIsNone(default.kvstore.get(ImageFile(name)))
+        self.assertEqual(get_image_url(post.image), post.image.url)
+
+    def test_backfill_command_generates_variants(self):
+        """Проверка создания вариантов картинок для srcset командой."""
+        self.assertEqual(get_image_sources(self.post.image)[1], [])
+        call_command("generate_thumbnails", workers=0, stdout=StringIO())
+        url, sources = get_image_sources(self.post.image)
+        self.assertNotEqual(url, self.post.image.url)
+        self.assertEqual([mime for mime, srcset in sources],
+                         ["image/webp", "image/jpeg"])
+        self.assertIn(".webp 480w", sources[0][1])
+        response = self.guest_client.get(reverse("posts:index"))
+        self.assertContains(response, 'type="image/webp"')
+        self.assertContains(response, sources[1][1])
+
+    def test_generated_variants_are_all_forgotten(self):
+        """Проверка сброса закэшированных промахов всех вариантов после
+        фоновой генерации."""
+        self.assertFalse(thumbnails_ready(self.post.image))
+        future = Future()
+        future.set_result(generate_thumbnails(self.post.image.name))
+        names = future.result()[0]
+        self.assertEqual(len(names), 5)
+        self.assertTrue(thumbnails_ready(self.post.image))
+        with mock.patch.object(default.kvstore, "forget") as forget:
+            _thumbnails_ready(future)
+        self.assertEqual(len(forget.call_args[0]), len(names))
+
+    def test_broken_pool_is_replaced(self):
+        """Проверка замены пула процессов после падения воркера."""
+        broken = mock.Mock(**{"submit.side_effect": BrokenProcessPool})
+        fresh = mock.Mock(**{"submit.return_value": Future()})
+        name = self.post.image.name
+        with mock.patch.object(thumbnails, "_executor", broken):
+            with mock.patch.object(
+                thumbnails, "make_executor", return_value=fresh
+            ):
+                self.assertIs(thumbnails.schedule_thumbnails(name),
+                              fresh.submit.return_value)
+                self.assertIs(thumbnails._executor, fresh)
+        broken.shutdown.assert_called_once_with(wait=False)
+        with mock.patch.object(thumbnails, "_executor", broken):
+            with mock.patch.object(
+                thumbnails, "make_executor", return_value=broken
+            ), self.assertLogs("posts.thumbnails", "ERROR"):
+                self.assertIsNone(thumbnails.schedule_thumbnails(name))
+
+    def test_backfill_command_skips_broken_images(self):
+        """Проверка, что битая картинка не прерывает создание миниатюр."""
+        default_storage.save("posts/broken.jpg", ContentFile(b"broken"))
+
+        def generate(name):
+            if name == "posts/broken.jpg":
+                raise OSError("cannot identify image file")
+            return generate_thumbnails(name)
+
+        output, errors = StringIO(), StringIO()
+        with mock.patch(
+            "posts.management.commands.generate_thumbnails"
+            ".generate_thumbnails",
+            side_effect=generate,
+        ):
+            call_command("generate_thumbnails", workers=0,
+                         stdout=output, stderr=errors)
+        self.assertIn("обновлено: 1, ошибок: 1", output.getvalue())
+        self.assertIn("posts/broken.jpg: OSError", errors.getvalue())
+        self.assertTrue(thumbnails_ready(self.post.image))
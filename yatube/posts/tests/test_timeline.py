@@ -0,0 +1,113 @@
+from unittest import mock
+
+from faker import Faker
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..models import Post, Follow, TimelineEntry
+from .. import timeline
+from .utils import run_on_commit
+
+User = get_user_model()
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        fake = Faker()
+        cls.user = User.objects.create_user(
+            username=fake.user_name(),
+        )
+        cls.author = User.objects.create_user(
+            username=fake.user_name() + "_author",
+        )
+        cls.old_post = Post.objects.create(
+            author=cls.author,
+            text=fake.text(),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def follow(self):
+        self.authorized_client.get(
+            reverse("posts:profile_follow",
+                    kwargs={"username": self.author.username})
+        )
+
+    def test_follow_backfills_timeline(self):
+        """Проверка заполнения ленты старыми постами при подписке."""
+        self.follow()
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.user, post=self.old_post
+        ).exists())
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        """Проверка попадания нового поста в ленты подписчиков."""
+        self.follow()
+        post = Post.objects.create(author=self.author)
+        response = self.authorized_client.get(reverse("posts:follow_index"))
+        self.assertIn(post, response.context["page_obj"])
+        self.assertEqual(
+            TimelineEntry.objects.get(user=self.user, post=post).created,
+            post.created,
+        )
+
+    def test_unfollow_trims_timeline(self):
+        """Проверка очистки ленты при отписке."""
+        self.follow()
+        self.authorized_client.get(
+            reverse("posts:profile_unfollow",
+                    kwargs={"username": self.author.username})
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.user).exists()
+        )
+        response = self.authorized_client.get(reverse("posts:follow_index"))
+        self.assertEqual(len(response.context["page_obj"]), 0)
+
+    @mock.patch.object(timeline, "FANOUT_FOLLOWERS_LIMIT", 1)
+    def test_popular_author_posts_are_read_on_demand(self):
+        """Проверка гибридного режима для авторов с большим числом
+        подписчиков."""
+        Follow.objects.create(user=self.user, author=self.author)
+        post = Post.objects.create(author=self.author)
+        self.assertFalse(TimelineEntry.objects.exists())
+        response = self.authorized_client.get(reverse("posts:follow_index"))
+        self.assertEqual(
+            list(response.context["page_obj"]), [post, self.old_post]
+        )
+
+    @mock.patch.object(timeline, "FANOUT_FOLLOWERS_LIMIT", 2)
+    def test_former_celebrity_posts_are_backfilled(self):
+        """Проверка заполнения лент в фоне, когда автор теряет статус
+        популярного."""
+        another_user = User.objects.create_user(username="another")
+        Follow.objects.create(user=self.user, author=self.author)
+        Follow.objects.create(user=another_user, author=self.author)
+        post = Post.objects.create(author=self.author)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        executor = mock.Mock()
+        with mock.patch.object(
+            timeline, "get_executor", return_value=executor
+        ), run_on_commit():
+            Follow.objects.get(user=another_user).delete()
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        (_, author_id), _ = executor.submit.call_args
+        self.assertEqual(author_id, self.author.id)
+        timeline.backfill_author(author_id)
+        self.assertNotIn(self.author.id, timeline.get_celebrities())
+        self.assertEqual(
+            set(TimelineEntry.objects.values_list("user_id", "post_id")),
+            {(self.user.id, post.id), (self.user.id, self.old_post.id)},
+        )
+        response = self.authorized_client.get(reverse("posts:follow_index"))
+        self.assertEqual(
+            list(response.context["page_obj"]), [post, self.old_post]
+        )
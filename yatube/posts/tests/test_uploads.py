@@ -0,0 +1,118 @@
+import shutil
+import tempfile
+from concurrent.futures import Future
+from io import BytesIO
+from unittest import mock
+
+from faker import Faker
+from PIL import Image
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from ..models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+IMAGE_DESCRIPTION_TAG = 0x010E
+
+
+def make_jpeg(size=(40, 20), exif=None):
+    image = BytesIO()
+    Image.new("RGB", size, "red").save(
+        image, "JPEG", exif=exif.tobytes() if exif else b""
+    )
+    return SimpleUploadedFile(
+        name="red.jpg",
+        content=image.getvalue(),
+        content_type="image/jpeg",
+    )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class UploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        fake = Faker()
+        cls.user = User.objects.create_user(
+            username=fake.user_name(),
+        )
+        cls.text = fake.text()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def create_post(self, image):
+        return self.authorized_client.post(
+            reverse("posts:post_create"),
+            data={"text": self.text, "image": image},
+        )
+
+    def test_upload_is_reencoded_without_exif(self):
+        """Проверка уменьшения картинки и удаления EXIF при загрузке."""
+        exif = Image.Exif()
+        exif[IMAGE_DESCRIPTION_TAG] = "secret"
+        with mock.patch("posts.uploads.UPLOAD_MAX_SIDE", 16):
+            self.create_post(make_jpeg(exif=exif))
+        post = Post.objects.get(author=self.user)
+        with Image.open(post.image.path) as image:
+            self.assertEqual(image.size, (16, 8))
+            self.assertEqual(image.format, "JPEG")
+            self.assertNotIn(IMAGE_DESCRIPTION_TAG, image.getexif())
+
+    def test_oversized_uploads_are_rejected(self):
+        """Проверка отказа в загрузке слишком больших картинок."""
+        for constant in ("UPLOAD_MAX_PIXELS", "UPLOAD_MAX_BYTES"):
+            with self.subTest(constant=constant), mock.patch(
+                f"posts.uploads.{constant}", 100
+            ):
+                response = self.create_post(make_jpeg())
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.context["form"].errors["image"])
+        self.assertFalse(Post.objects.exists())
+
+    def test_not_an_image_is_rejected(self):
+        """Проверка отказа в загрузке файла, не являющегося картинкой."""
+        response = self.create_post(SimpleUploadedFile(
+            name="text.jpg", content=b"text", content_type="image/jpeg"
+        ))
+        self.assertTrue(response.context["form"].errors["image"])
+        self.assertFalse(Post.objects.exists())
+
+    def test_truncated_image_is_rejected(self):
+        """Проверка отказа в загрузке обрезанной картинки."""
+        image = BytesIO()
+        Image.effect_noise((200, 200), 64).save(image, "PNG")
+        content = image.getvalue()
+        response = self.create_post(SimpleUploadedFile(
+            name="noise.png",
+            content=content[:len(content) // 2],
+            content_type="image/png",
+        ))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["form"].errors["image"])
+        self.assertFalse(Post.objects.exists())
+
+    def test_slow_reencode_is_rejected(self):
+        """Проверка отказа в загрузке, если пересжатие не успело."""
+        future = Future()
+        executor = mock.Mock(**{"submit.return_value": future})
+        with mock.patch("posts.uploads.UPLOAD_TIMEOUT", 0.01), mock.patch(
+            "posts.uploads.get_executor", return_value=executor
+        ):
+            response = self.create_post(make_jpeg())
+        self.assertTrue(response.context["form"].errors["image"])
+        self.assertTrue(future.cancelled())
+        self.assertFalse(Post.objects.exists())
@@ -3,6 +3,7 @@ import tempfile
 from faker import Faker
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase, Client, override_settings
 from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
@@ -58,6 +59,7 @@ class PostViewsTests(TestCase):
         shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
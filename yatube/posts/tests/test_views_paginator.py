@@ -1,14 +1,18 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.test import TestCase, Client
 from django.urls import reverse
 from faker import Faker
 
-from ..models import Post, Group
-from ..views import POSTS_PER_PAGE
+from ..models import Post, Group, Comment
+from ..views import COMMENTS_PER_PAGE, POSTS_PER_PAGE
 
 User = get_user_model()
 
 POSTS_FOR_TESTS = 13
+COMMENTS_FOR_TESTS = 25
 
 
 class PaginatorPostViewsTest(TestCase):
@@ -27,6 +31,7 @@ class PaginatorPostViewsTest(TestCase):
                                            group=cls.group)
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
 
     def test_first_pages_have_expected_number_of_records(self):
@@ -59,3 +64,104 @@ class PaginatorPostViewsTest(TestCase):
             with self.subTest(page=page):
                 response = self.guest_client.get(page + "?page=2")
                 self.assertEqual(len(response.context["page_obj"]), objects)
+
+    def test_cursor_pages_have_expected_records(self):
+        """Проверка перехода по курсорам next/previous на страницах
+        index, group_list и profile."""
+        pages = [
+            reverse("posts:index"),
+            reverse("posts:group_list", kwargs={"slug": self.group.slug}),
+            reverse("posts:profile", kwargs={"username": self.user.username}),
+        ]
+        for page in pages:
+            with self.subTest(page=page):
+                first = self.guest_client.get(page).context["page_obj"]
+                second = self.guest_client.get(
+                    page, {"cursor": first.next_cursor}
+                ).context["page_obj"]
+                self.assertEqual(
+                    len(second), POSTS_FOR_TESTS - POSTS_PER_PAGE
+                )
+                self.assertFalse(second.has_next())
+                self.assertTrue(set(first).isdisjoint(second))
+                previous = self.guest_client.get(
+                    page, {"cursor": second.previous_cursor}
+                ).context["page_obj"]
+                self.assertEqual(list(previous), list(first))
+                self.assertFalse(previous.has_previous())
+
+    def test_cursor_page_does_not_count_posts(self):
+        """Проверка отсутствия COUNT(*) при переходе по курсору."""
+        first = self.guest_client.get(
+            reverse("posts:group_list", kwargs={"slug": self.group.slug})
+        ).context["page_obj"]
+        with CaptureQueriesContext(connection) as queries:
+            self.guest_client.get(
+                reverse("posts:group_list", kwargs={"slug": self.group.slug}),
+                {"cursor": first.next_cursor},
+            )
+        for query in queries.captured_queries:
+            self.assertNotIn("COUNT(", query["sql"].upper())
+
+    def test_broken_cursor_returns_first_page(self):
+        """Проверка, что некорректный курсор открывает первую страницу."""
+        response = self.guest_client.get(
+            reverse("posts:index"), {"cursor": "broken"}
+        )
+        self.assertEqual(response.context["page_obj"].number, 1)
+        self.assertEqual(len(response.context["page_obj"]), POSTS_PER_PAGE)
+
+
+class PaginatorCommentViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        fake = Faker()
+        cls.user = User.objects.create_user(
+            username=fake.user_name()
+        )
+        cls.post = Post.objects.create(author=cls.user, text=fake.text())
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text=str(i))
+            for i in range(COMMENTS_FOR_TESTS)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_post_detail_shows_first_comments(self):
+        """Проверка вывода только первой порции комментариев поста."""
+        response = self.guest_client.get(
+            reverse("posts:post_detail", kwargs={"post_id": self.post.id})
+        )
+        comments = response.context["comments"]
+        self.assertEqual(len(comments), COMMENTS_PER_PAGE)
+        self.assertEqual(comments[0].text, "0")
+        self.assertContains(
+            response,
+            reverse("posts:comments", kwargs={"post_id": self.post.id})
+            + f"?cursor={comments.next_cursor}",
+        )
+
+    def test_comments_fragment_returns_next_batch(self):
+        """Проверка выдачи следующей порции комментариев фрагментом."""
+        url = reverse("posts:comments", kwargs={"post_id": self.post.id})
+        first = self.guest_client.get(url).context["comments"]
+        response = self.guest_client.get(
+            url, {"cursor": first.next_cursor}
+        )
+        comments = response.context["comments"]
+        self.assertEqual([comment.text for comment in comments],
+                         [str(i) for i in range(COMMENTS_PER_PAGE,
+                                                COMMENTS_FOR_TESTS)])
+        self.assertFalse(comments.has_next())
+        self.assertNotContains(response, "<html")
+        self.assertNotContains(response, "data-comments-url")
+
+    def test_comments_fragment_of_missing_post(self):
+        """Проверка ответа 404 для комментариев несуществующего поста."""
+        response = self.guest_client.get(
+            reverse("posts:comments", kwargs={"post_id": self.post.id + 1})
+        )
+        self.assertEqual(response.status_code, 404)
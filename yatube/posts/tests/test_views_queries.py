@@ -0,0 +1,113 @@
+from faker import Faker
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..models import Post, Group, Comment, Follow
+from ..views import POSTS_PER_PAGE
+from .. import timeline
+from .utils import QueryBudgetMixin
+
+User = get_user_model()
+
+AUTHORS_FOR_TESTS = 3
+COMMENTS_FOR_TESTS = 5
+
+
+class ViewQueriesTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        fake = Faker()
+        cls.user = User.objects.create_user(
+            username=fake.user_name(),
+        )
+        cls.group = Group.objects.create(
+            title=fake.word(),
+            slug=fake.slug(),
+        )
+        cls.authors = [
+            User.objects.create_user(
+                username=f"{fake.user_name()}{i}",
+                first_name=fake.first_name(),
+                last_name=fake.last_name(),
+            )
+            for i in range(AUTHORS_FOR_TESTS)
+        ]
+        Follow.objects.create(user=cls.user, author=cls.authors[0])
+        for i in range(POSTS_PER_PAGE + 1):
+            cls.post = Post.objects.create(
+                author=cls.authors[0] if i % 2 else cls.authors[1],
+                group=cls.group,
+                text=fake.text(),
+            )
+        for i in range(COMMENTS_FOR_TESTS):
+            Comment.objects.create(
+                post=cls.post,
+                author=cls.authors[i % AUTHORS_FOR_TESTS],
+                text=fake.text(),
+            )
+
+    def setUp(self):
+        cache.clear()
+        timeline.get_celebrities()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_public_views_query_budget(self):
+        """Проверка числа запросов к БД на публичных страницах."""
+        # Cold index and group pages also estimate and count their posts.
+        budgets = {
+            reverse("posts:index"): 3,
+            reverse("posts:group_list", kwargs={"slug": self.group.slug}):
+            3,
+            reverse("posts:profile",
+                    kwargs={"username": self.authors[0].username}): 2,
+            reverse("posts:post_detail", kwargs={"post_id": self.post.id}):
+            2,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url):
+                self.assertQueryBudget(self.guest_client, url, budget)
+            with self.subTest(url=url, cached=True):
+                self.assertQueryBudget(self.guest_client, url, 0)
+
+    def test_authorized_views_query_budget(self):
+        """Проверка числа запросов к БД на страницах пользователя."""
+        budgets = {
+            reverse("posts:index"): 5,
+            reverse("posts:follow_index"): 3,
+            reverse("posts:profile",
+                    kwargs={"username": self.authors[0].username}): 5,
+            reverse("posts:post_detail", kwargs={"post_id": self.post.id}):
+            4,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url):
+                self.assertQueryBudget(self.authorized_client, url, budget)
+
+    def test_feed_counts_cached(self):
+        """Проверка, что число постов ленты берётся из кэша и учитывает
+        новые посты."""
+        url = reverse("posts:index")
+        self.assertQueryBudget(self.authorized_client, url, 5)
+        response = self.assertQueryBudget(self.authorized_client, url, 3)
+        paginator = response.context["page_obj"].paginator
+        self.assertEqual(paginator.count, POSTS_PER_PAGE + 1)
+        Post.objects.create(author=self.user, text="Новый пост")
+        response = self.assertQueryBudget(self.authorized_client, url, 3)
+        paginator = response.context["page_obj"].paginator
+        self.assertEqual(paginator.count, POSTS_PER_PAGE + 2)
+
+    def test_query_budget_does_not_grow_with_data(self):
+        """Проверка, что число запросов не зависит от числа объектов."""
+        url = reverse("posts:post_detail", kwargs={"post_id": self.post.id})
+        with self.subTest(comments=COMMENTS_FOR_TESTS):
+            self.assertQueryBudget(self.authorized_client, url, 4)
+        for author in self.authors:
+            Comment.objects.create(post=self.post, author=author)
+        with self.subTest(comments=COMMENTS_FOR_TESTS + AUTHORS_FOR_TESTS):
+            self.assertQueryBudget(self.authorized_client, url, 4)
@@ -0,0 +1,34 @@
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@contextmanager
+def run_on_commit():
+    """Выполнить колбэки ``transaction.on_commit`` из блока: транзакция
+    ``TestCase`` никогда не фиксируется."""
+    start = len(connection.run_on_commit)
+    yield
+    for _, callback in connection.run_on_commit[start:]:
+        callback()
+
+
+class QueryBudgetMixin:
+    """Проверка точного числа SQL-запросов, выполняемых при запросе URL."""
+
+    def assertQueryBudget(self, client, url, budget):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        executed = len(context.captured_queries)
+        queries = "\n".join(
+            f"{number}. {query['sql']}"
+            for number, query in enumerate(context.captured_queries, 1)
+        )
+        self.assertEqual(
+            executed,
+            budget,
+            f"{url}: выполнено {executed} запросов вместо {budget}:\n"
+            f"{queries}",
+        )
+        return response
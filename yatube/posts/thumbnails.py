@@ -0,0 +1,196 @@
+import atexit
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from sorl.thumbnail import default, delete, get_thumbnail
+from sorl.thumbnail.base import ThumbnailBackend as BaseThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings, settings
+from sorl.thumbnail.images import ImageFile
+from sorl.thumbnail.kvstores.base import add_prefix
+
+from .cache import bump_feed_generation
+
+logger = logging.getLogger(__name__)
+
+POST_THUMBNAIL_GEOMETRY = "960x339"
+POST_THUMBNAIL_OPTIONS = {"crop": "center", "upscale": True}
+# Width variants rendered as srcset, narrowest first; every variant keeps
+# the aspect ratio of POST_THUMBNAIL_GEOMETRY.
+POST_IMAGE_WIDTHS = (480, 960)
+POST_IMAGE_FORMATS = ("WEBP", "JPEG")
+THUMBNAIL_WORKERS = 2
+
+_executor = None
+
+
+class ThumbnailBackend(BaseThumbnailBackend):
+    def get_ready_thumbnail(self, file_, geometry_string, **options):
+        """Return the thumbnail only if it is already generated."""
+        source = ImageFile(file_)
+        if settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault("format", self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+
+def delete_thumbnails(name):
+    """Drop thumbnails and key-value store entries of the image ``name``."""
+    if name:
+        delete(name, delete_file=False)
+
+
+def get_variants():
+    """Yield ``(format, width, geometry, options)`` of every image variant."""
+    width, height = map(int, POST_THUMBNAIL_GEOMETRY.split("x"))
+    for image_format in POST_IMAGE_FORMATS:
+        for variant_width in POST_IMAGE_WIDTHS:
+            variant_height = round(variant_width * height / width)
+            options = dict(POST_THUMBNAIL_OPTIONS, format=image_format)
+            yield (image_format, variant_width,
+                   f"{variant_width}x{variant_height}", options)
+
+
+def get_thumbnail_jobs():
+    """Yield ``(geometry, options)`` of the thumbnail and every variant."""
+    yield POST_THUMBNAIL_GEOMETRY, POST_THUMBNAIL_OPTIONS
+    for *_, geometry, options in get_variants():
+        yield geometry, options
+
+
+def thumbnails_ready(image):
+    """Whether the thumbnail and all variants of ``image`` are generated."""
+    return all(
+        default.backend.get_ready_thumbnail(image, geometry, **options)
+        for geometry, options in get_thumbnail_jobs()
+    )
+
+
+def forget_thumbnails(names):
+    """Drop "missing" markers cached for the thumbnails ``names``, which
+    another process has just generated."""
+    default.kvstore.forget(*(
+        add_prefix(ImageFile(name, default.storage).key) for name in names
+    ))
+
+
+def get_image_url(image):
+    if not image:
+        return None
+    thumbnail = default.backend.get_ready_thumbnail(
+        image, POST_THUMBNAIL_GEOMETRY, **POST_THUMBNAIL_OPTIONS
+    )
+    return thumbnail.url if thumbnail else image.url
+
+
+def get_image_sources(image):
+    """Return ``(fallback url, [(mime type, srcset), ...])`` for ``image``.
+
+    Only variants that are already generated make it into ``srcset``.
+    """
+    if not image:
+        return None, []
+    srcsets = {}
+    for image_format, width, geometry, options in get_variants():
+        thumbnail = default.backend.get_ready_thumbnail(
+            image, geometry, **options
+        )
+        if thumbnail:
+            srcsets.setdefault(image_format, []).append(
+                f"{thumbnail.url} {width}w"
+            )
+    sources = [
+        (f"image/{image_format.lower()}", ", ".join(srcsets[image_format]))
+        for image_format in POST_IMAGE_FORMATS
+        if image_format in srcsets
+    ]
+    return get_image_url(image), sources
+
+
+def generate_thumbnails(name):
+    """Worker job: render the post thumbnail and variants of ``name``.
+
+    Returns the names of all thumbnails and whether anything had to be
+    generated.
+    """
+    created = False
+    names = []
+    for geometry, options in get_thumbnail_jobs():
+        ready = default.backend.get_ready_thumbnail(name, geometry, **options)
+        thumbnail = ready or get_thumbnail(name, geometry, **options)
+        names.append(thumbnail.name)
+        created = created or ready is None
+    return names, created
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def make_executor(workers=THUMBNAIL_WORKERS):
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = make_executor()
+        atexit.register(_executor.shutdown, wait=False)
+    return _executor
+
+
+def reset_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+    _executor = None
+
+
+def _thumbnails_ready(future):
+    try:
+        names, created = future.result()
+    except BrokenProcessPool:
+        logger.exception("Процесс создания миниатюр упал")
+        reset_executor()
+        return
+    except Exception:
+        logger.exception("Не удалось создать миниатюру")
+        return
+    if not created:
+        return
+    # The worker wrote the key-value store from another process: drop
+    # the "missing" markers this process may have cached meanwhile.
+    forget_thumbnails(names)
+    bump_feed_generation()
+
+
+def schedule_thumbnails(name):
+    """Generate thumbnails of ``name`` in the background.
+
+    Runs after the post is committed, so it never raises: the feed shows
+    the original image until thumbnails exist.
+    """
+    try:
+        try:
+            future = get_executor().submit(generate_thumbnails, name)
+        except BrokenProcessPool:
+            # A crashed worker breaks the pool for good: start a new one.
+            reset_executor()
+            future = get_executor().submit(generate_thumbnails, name)
+    except Exception:
+        logger.exception("Не удалось поставить миниатюру в очередь")
+        return None
+    future.add_done_callback(_thumbnails_ready)
+    return future
@@ -0,0 +1,213 @@
+import atexit
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Q
+
+from core.caches import shared_timeout
+
+from .models import AuthorStats, Follow, Post, TimelineEntry
+
+logger = logging.getLogger(__name__)
+
+# Authors with at least this many followers are not fanned out on write:
+# their posts are merged into the follow feed on read instead.
+FANOUT_FOLLOWERS_LIMIT = 5000
+# A new follow copies only this many newest posts of the author into the
+# timeline, so follow feeds end there; older posts stay on the profile.
+TIMELINE_BACKFILL_POSTS = 200
+TIMELINE_BATCH_SIZE = 1000
+
+CELEBRITIES_CACHE_KEY = "timeline:celebrities"
+CELEBRITIES_CACHE_TIMEOUT = 60 * 60
+
+_executor = None
+
+
+def get_celebrities():
+    celebrities = cache.get(CELEBRITIES_CACHE_KEY)
+    if celebrities is None:
+        celebrities = set(
+            AuthorStats.objects.filter(
+                followers_count__gte=FANOUT_FOLLOWERS_LIMIT
+            ).values_list("user_id", flat=True)
+        )
+        cache.set(
+            CELEBRITIES_CACHE_KEY, celebrities,
+            shared_timeout(CELEBRITIES_CACHE_TIMEOUT),
+        )
+    return celebrities
+
+
+def is_celebrity(author_id):
+    return author_id in get_celebrities()
+
+
+def fan_out(post):
+    if is_celebrity(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list("user_id", flat=True)
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(
+                user_id=user_id,
+                post_id=post.id,
+                author_id=post.author_id,
+                created=post.created,
+            )
+            for user_id in followers.iterator()
+        ),
+        batch_size=TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def get_followers_count(author_id):
+    return AuthorStats.objects.filter(
+        user_id=author_id
+    ).values_list("followers_count", flat=True).first() or 0
+
+
+def backfill(follow):
+    if get_followers_count(follow.author_id) >= FANOUT_FOLLOWERS_LIMIT:
+        cache.delete(CELEBRITIES_CACHE_KEY)
+    if is_celebrity(follow.author_id):
+        return
+    posts = Post.objects.filter(
+        author_id=follow.author_id
+    ).values_list("id", "created")[:TIMELINE_BACKFILL_POSTS]
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(
+                user_id=follow.user_id,
+                post_id=post_id,
+                author_id=follow.author_id,
+                created=created,
+            )
+            for post_id, created in posts
+        ],
+        batch_size=TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def backfill_follows(follows):
+    """Backfill the timelines of every follow in the ``follows`` queryset
+    in one statement; follows of celebrities are skipped.
+
+    Each follow gets at most ``TIMELINE_BACKFILL_POSTS`` newest posts.
+    """
+    follow_ids, params = follows.exclude(
+        author_id__in=get_celebrities()
+    ).values("id").query.sql_with_params()
+    sql = f"""
+        {connection.ops.insert_statement(ignore_conflicts=True)}
+            {TimelineEntry._meta.db_table}
+            (user_id, post_id, author_id, created)
+        SELECT user_id, post_id, author_id, created FROM (
+            SELECT f.user_id, p.id AS post_id, p.author_id, p.created,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY f.id ORDER BY p.created DESC
+                   ) AS number
+            FROM {Follow._meta.db_table} f
+            JOIN {Post._meta.db_table} p ON p.author_id = f.author_id
+            WHERE f.id IN ({follow_ids})
+        ) ranked WHERE number <= %s
+        {connection.ops.ignore_conflicts_suffix_sql(ignore_conflicts=True)}
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, [*params, TIMELINE_BACKFILL_POSTS])
+        return cursor.rowcount
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        # One worker: backfills are rare and each one is a single large
+        # statement, so running them one at a time spares the database.
+        _executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="timeline"
+        )
+        atexit.register(_executor.shutdown, wait=False)
+    return _executor
+
+
+def backfill_author(author_id):
+    """Backfill the timelines of every follower of ``author_id``, who has
+    just stopped being a celebrity."""
+    # Until the cache is dropped the posts are still merged on read, and
+    # backfill_follows would skip the author.
+    cache.delete(CELEBRITIES_CACHE_KEY)
+    return backfill_follows(Follow.objects.filter(author_id=author_id))
+
+
+def _run_backfill(author_id):
+    try:
+        return backfill_author(author_id)
+    finally:
+        # The worker thread has its own connection: do not leave it open.
+        connection.close()
+
+
+def _backfill_done(future):
+    try:
+        future.result()
+    except Exception:
+        logger.exception("Не удалось заполнить ленты подписчиков")
+
+
+def schedule_backfill(author_id):
+    """Run ``backfill_author`` in the background; it copies up to
+    ``TIMELINE_BACKFILL_POSTS`` posts for each of thousands of followers,
+    far too much for the request that caused it."""
+    try:
+        future = get_executor().submit(_run_backfill, author_id)
+    except Exception:
+        logger.exception("Не удалось поставить заполнение лент в очередь")
+        return None
+    future.add_done_callback(_backfill_done)
+    return future
+
+
+def trim(follow):
+    TimelineEntry.objects.filter(
+        user_id=follow.user_id, author_id=follow.author_id
+    ).delete()
+    if get_followers_count(follow.author_id) == FANOUT_FOLLOWERS_LIMIT - 1:
+        # The author has just stopped being a celebrity: their posts are
+        # about to stop being merged into follow feeds on read.
+        author_id = follow.author_id
+        transaction.on_commit(lambda: schedule_backfill(author_id))
+
+
+def timeline_posts(user):
+    """Follow feed of ``user``: timeline entries or, in hybrid mode, posts."""
+    celebrities = get_celebrities()
+    if celebrities:
+        followed_celebrities = list(
+            Follow.objects.filter(
+                user=user, author_id__in=celebrities
+            ).values_list("author_id", flat=True)
+        )
+        if followed_celebrities:
+            entries = TimelineEntry.objects.filter(
+                user=user
+            ).values("post_id")
+            return Post.objects.filter(
+                Q(id__in=entries) | Q(author_id__in=followed_celebrities)
+            ).select_related("author", "group")
+    return TimelineEntry.objects.filter(user=user).select_related(
+        "post__author", "post__group"
+    )
+
+
+def as_posts(page_obj):
+    page_obj.object_list = [
+        item.post if isinstance(item, TimelineEntry) else item
+        for item in page_obj.object_list
+    ]
+    return page_obj
@@ -0,0 +1,165 @@
+import atexit
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+# Not an OSError before Python 3.11.
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+from django import forms
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template.defaultfilters import filesizeformat
+
+UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+UPLOAD_MAX_PIXELS = 40_000_000
+# Longest side of a stored image; bigger uploads are downscaled.
+UPLOAD_MAX_SIDE = 1920
+UPLOAD_FORMATS = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "GIF": "image/gif",
+    "WEBP": "image/webp",
+}
+UPLOAD_JPEG_QUALITY = 85
+UPLOAD_WORKERS = 2
+UPLOAD_TIMEOUT = 30
+INVALID_IMAGE_MESSAGE = "Загрузите корректное изображение."
+
+_executor = None
+
+
+def inspect_image(file):
+    """Return ``(format, (width, height))`` read from the image header.
+
+    Pillow parses only the header in ``Image.open``, pixel data is not
+    decoded here.
+    """
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            image_format, size = image.format, image.size
+    except (Image.DecompressionBombError, OSError, SyntaxError,
+            ValueError):
+        raise forms.ValidationError(
+            INVALID_IMAGE_MESSAGE, code="invalid_image"
+        )
+    finally:
+        file.seek(0)
+    if image_format not in UPLOAD_FORMATS:
+        raise forms.ValidationError(
+            "Поддерживаются только изображения JPEG, PNG, GIF и WebP.",
+            code="invalid_image_format",
+        )
+    width, height = size
+    if width * height > UPLOAD_MAX_PIXELS:
+        raise forms.ValidationError(
+            "Изображение слишком большое: %(width)d×%(height)d.",
+            code="image_too_large",
+            params={"width": width, "height": height},
+        )
+    return image_format, size
+
+
+def reencode(source, image_format, max_side):
+    """Worker job: downscale the image and drop its metadata.
+
+    ``source`` is a path to the uploaded file or its content. Animated
+    images keep only their first frame.
+    """
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+    with Image.open(source) as image:
+        # JPEG can be decoded at a reduced scale right away.
+        image.draft("RGB", (max_side, max_side))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_side, max_side))
+        options = {}
+        if image_format == "JPEG":
+            if image.mode not in ("RGB", "L", "CMYK"):
+                image = image.convert("RGB")
+            options = {"quality": UPLOAD_JPEG_QUALITY, "optimize": True}
+        elif "transparency" in image.info:
+            options["transparency"] = image.info["transparency"]
+        output = BytesIO()
+        image.save(output, image_format, **options)
+    return output.getvalue()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=UPLOAD_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        atexit.register(_executor.shutdown, wait=False)
+    return _executor
+
+
+def reset_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+    _executor = None
+
+
+class BoundedImageField(forms.FileField):
+    """Image field that never decodes uploads in the web process.
+
+    The header is checked against byte and pixel caps, then the image is
+    re-encoded without EXIF in a worker process.
+    """
+
+    default_error_messages = {
+        "file_too_large": "Размер файла не должен превышать %(max)s.",
+    }
+
+    def to_python(self, data):
+        data = super().to_python(data)
+        if data is None:
+            return None
+        if data.size > UPLOAD_MAX_BYTES:
+            raise forms.ValidationError(
+                self.error_messages["file_too_large"],
+                code="file_too_large",
+                params={"max": filesizeformat(UPLOAD_MAX_BYTES)},
+            )
+        image_format, size = inspect_image(data)
+        if hasattr(data, "temporary_file_path"):
+            source = data.temporary_file_path()
+        else:
+            source = data.read()
+        try:
+            future = get_executor().submit(
+                reencode, source, image_format, UPLOAD_MAX_SIDE
+            )
+            content = future.result(timeout=UPLOAD_TIMEOUT)
+        except FutureTimeoutError:
+            # Only a job still waiting in the queue can be cancelled.
+            future.cancel()
+            raise forms.ValidationError(
+                INVALID_IMAGE_MESSAGE, code="invalid_image"
+            )
+        except BrokenProcessPool:
+            # A crashed worker breaks the pool for every later upload.
+            reset_executor()
+            raise forms.ValidationError(
+                INVALID_IMAGE_MESSAGE, code="invalid_image"
+            )
+        except (Image.DecompressionBombError, OSError, SyntaxError,
+                ValueError):
+            # Truncated or corrupt pixel data.
+            raise forms.ValidationError(
+                INVALID_IMAGE_MESSAGE, code="invalid_image"
+            )
+        return SimpleUploadedFile(
+            data.name, content, UPLOAD_FORMATS[image_format]
+        )
+
+    def widget_attrs(self, widget):
+        attrs = super().widget_attrs(widget)
+        if isinstance(widget, forms.FileInput) and "accept" not in attrs:
+            attrs["accept"] = ",".join(UPLOAD_FORMATS.values())
+        return attrs
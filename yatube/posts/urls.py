@@ -9,16 +9,34 @@ urlpatterns = [
     path("group/<slug:slug>/", views.group_posts, name="group_list"),
     path("profile/<str:username>/", views.profile, name="profile"),
     path("posts/<int:post_id>/", views.post_detail, name="post_detail"),
+    path("posts/<int:post_id>/comments/",
+         views.post_comments, name="comments"),
     path("posts/<int:post_id>/edit/", views.post_edit, name="post_edit"),
     path("create/", views.post_create, name="post_create"),
     path("posts/<int:post_id>/comment/",
          views.add_comment, name="add_comment"),
     path("follow/", views.follow_index, name="follow_index"),
+    path("search/", views.search, name="search"),
     path(
         "profile/<str:username>/follow/",
         views.profile_follow,
         name="profile_follow"
     ),
+    path(
+        "profile/<str:username>/followers/",
+        views.profile_followers,
+        name="profile_followers"
+    ),
+    path(
+        "profile/<str:username>/following/",
+        views.profile_following,
+        name="profile_following"
+    ),
+    path(
+        "profile/<str:username>/export/",
+        views.profile_export,
+        name="profile_export"
+    ),
     path(
         "profile/<str:username>/unfollow/",
         views.profile_unfollow,
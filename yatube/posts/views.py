@@ -1,54 +1,112 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.db import IntegrityError, transaction
+from django.core.exceptions import PermissionDenied
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render, redirect
 
+from core.paginators import CountedCursorPaginator, CursorPaginator
+from core.ratelimit import limit_safe_methods
+
+from . import timeline
+from .search import search_posts
+from .cache import anonymous_response_cache, get_feed_cache
+from .counters import (
+    INDEX_COUNT_NAME, get_follow_counts, get_posts_count, group_count_name
+)
+from .export import EXPORT_FORMATS, export_stream
 from .models import Group, Post, Comment, Follow
 from .forms import PostForm, CommentForm
 
 User = get_user_model()
 
 POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
+FOLLOWS_PER_PAGE = 50
+
+
+def get_page_obj(request, posts, ordering="-created", **count_options):
+    """Page of ``posts``; ``count_options`` enable the page number window.
+
+    They are passed to CountedCursorPaginator: ``count`` or ``count_name``
+    and ``approximate``.
+    """
+    if count_options:
+        paginator = CountedCursorPaginator(
+            posts, POSTS_PER_PAGE, ordering=ordering, **count_options
+        )
+    else:
+        paginator = CursorPaginator(posts, POSTS_PER_PAGE, ordering=ordering)
+    return paginator.get_page(
+        request.GET.get("page"), request.GET.get("cursor")
+    )
 
 
+def get_comments_page(request, post_id):
+    comments = Comment.objects.filter(post_id=post_id).select_related(
+        "author"
+    )
+    paginator = CursorPaginator(
+        comments, COMMENTS_PER_PAGE, ordering="created"
+    )
+    return paginator.get_page(cursor=request.GET.get("cursor"))
+
+
+def get_follows_page(request, follows):
+    # Only cursors, so deep pages of huge lists cost no OFFSET scan.
+    paginator = CursorPaginator(follows, FOLLOWS_PER_PAGE, ordering="-id")
+    return paginator.get_page(cursor=request.GET.get("cursor"))
+
+
+@anonymous_response_cache
 def index(request):
     template = "posts/index.html"
-    posts = Post.objects.all()
-    paginator = Paginator(posts, POSTS_PER_PAGE)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    posts = Post.objects.select_related("author", "group")
+    page_obj = get_page_obj(
+        request, posts, count_name=INDEX_COUNT_NAME, approximate=True
+    )
     context = {
         "page_obj": page_obj,
+        "feed_cache": get_feed_cache(),
     }
     return render(request, template, context)
 
 
+@anonymous_response_cache
 def group_posts(request, slug):
     template = "posts/group_list.html"
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = Paginator(posts, POSTS_PER_PAGE)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    posts = group.posts.select_related("author", "group")
+    page_obj = get_page_obj(
+        request, posts, count_name=group_count_name(group.pk)
+    )
     context = {
         "page_obj": page_obj,
         "group": group,
+        "feed_cache": get_feed_cache(),
     }
     return render(request, template, context)
 
 
+@anonymous_response_cache
 def profile(request, username):
     template = "posts/profile.html"
-    author = get_object_or_404(User, username=username)
-    posts = Post.objects.filter(author__username=username)
-    posts_count = posts.count()
-    paginator = Paginator(posts, POSTS_PER_PAGE)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    author = get_object_or_404(
+        User.objects.select_related("stats"), username=username
+    )
+    posts = Post.objects.filter(author=author).select_related(
+        "author", "group"
+    )
+    posts_count = get_posts_count(author)
+    followers_count, following_count = get_follow_counts(author)
+    page_obj = get_page_obj(request, posts, count=posts_count)
     context = {
         "page_obj": page_obj,
         "posts_count": posts_count,
+        "followers_count": followers_count,
+        "following_count": following_count,
         "author": author,
+        "feed_cache": get_feed_cache(),
     }
     if request.user.is_authenticated and Follow.objects.filter(
         user=request.user, author=author
@@ -59,21 +117,46 @@ def profile(request, username):
     return render(request, template, context)
 
 
+@anonymous_response_cache
 def post_detail(request, post_id):
     template = "posts/post_detail.html"
-    post = get_object_or_404(Post, id=post_id)
-    posts_count = Post.objects.filter(author=post.author).count()
+    post = get_object_or_404(
+        Post.objects.select_related("author__stats", "group"), id=post_id
+    )
+    posts_count = get_posts_count(post.author)
     form = CommentForm(request.POST or None)
-    comments = Comment.objects.filter(post_id=post_id)
     context = {
         "posts_count": posts_count,
         "post": post,
         "form": form,
-        "comments": comments,
+        "comments": get_comments_page(request, post_id),
     }
     return render(request, template, context)
 
 
+@anonymous_response_cache
+def post_comments(request, post_id):
+    template = "posts/includes/comments.html"
+    post = get_object_or_404(Post.objects.only("id"), id=post_id)
+    context = {
+        "post": post,
+        "comments": get_comments_page(request, post_id),
+    }
+    return render(request, template, context)
+
+
+def search(request):
+    template = "posts/search.html"
+    query = request.GET.get("q", "")
+    posts = search_posts(query)
+    context = {"query": query}
+    if posts is not None:
+        context["page_obj"] = get_page_obj(
+            request, posts.select_related("author", "group"), ordering="rank"
+        )
+    return render(request, template, context)
+
+
 @login_required
 def post_create(request):
     template = "posts/create_post.html"
@@ -81,7 +164,10 @@ def post_create(request):
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
-        post.save()
+        # The post and its counters commit together; validation and the
+        # image re-encode stay outside the transaction.
+        with transaction.atomic():
+            post.save()
         return redirect("posts:profile", username=request.user)
 
     return render(request, template, {"form": form})
@@ -100,7 +186,8 @@ def post_edit(request, post_id):
         if form.is_valid():
             post = form.save(commit=False)
             post.author = request.user
-            post.save()
+            with transaction.atomic():
+                post.save()
             return redirect("posts:post_detail", post_id=post_id)
 
         form = PostForm(instance=post)
@@ -120,7 +207,8 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        with transaction.atomic():
+            comment.save()
 
     return redirect("posts:post_detail", post_id=post_id)
 
@@ -128,28 +216,85 @@ def add_comment(request, post_id):
 @login_required
 def follow_index(request):
     template = "posts/follow.html"
-    following = Follow.objects.filter(
-        user=request.user
-    ).values_list("author_id", flat=True)
-    posts = Post.objects.filter(author_id__in=following)
-    paginator = Paginator(posts, POSTS_PER_PAGE)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    page_obj = timeline.as_posts(
+        get_page_obj(request, timeline.timeline_posts(request.user))
+    )
     return render(request, template, {"page_obj": page_obj})
 
 
+@limit_safe_methods
 @login_required
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if request.user != author:
-        Follow.objects.create(user=request.user, author=author)
+        try:
+            with transaction.atomic():
+                Follow.objects.create(user=request.user, author=author)
+        except IntegrityError:
+            # Already following, e.g. after a double click.
+            pass
         return redirect("posts:follow_index")
 
     return redirect("posts:index")
 
 
+@limit_safe_methods
 @login_required
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
     Follow.objects.filter(user=request.user, author=author).delete()
     return redirect("posts:follow_index")
+
+
+def follow_list(request, username, relation):
+    """Users following ``username`` (``relation="followers"``) or followed
+    by them (``"following"``), newest first."""
+    template = "posts/follow_list.html"
+    author = get_object_or_404(
+        User.objects.select_related("stats"), username=username
+    )
+    lookup, shown = (
+        ("author", "user") if relation == "followers" else ("user", "author")
+    )
+    follows = Follow.objects.filter(**{lookup: author}).select_related(
+        shown
+    ).only("id", shown, *(f"{shown}__{field}" for field in (
+        "username", "first_name", "last_name"
+    )))
+    page_obj = get_follows_page(request, follows)
+    followers_count, following_count = get_follow_counts(author)
+    context = {
+        "author": author,
+        "relation": relation,
+        "page_obj": page_obj,
+        "users": [getattr(follow, shown) for follow in page_obj],
+        "followers_count": followers_count,
+        "following_count": following_count,
+    }
+    return render(request, template, context)
+
+
+def profile_followers(request, username):
+    return follow_list(request, username, "followers")
+
+
+def profile_following(request, username):
+    return follow_list(request, username, "following")
+
+
+@login_required
+def profile_export(request, username):
+    author = get_object_or_404(User, username=username)
+    if request.user != author and not request.user.is_staff:
+        raise PermissionDenied
+    export_format = request.GET.get("format", "ndjson")
+    if export_format not in EXPORT_FORMATS:
+        export_format = "ndjson"
+    content_type, extension = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(
+        export_stream(author, export_format), content_type=content_type
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{author.username}.{extension}"'
+    )
+    return response
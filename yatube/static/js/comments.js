@@ -0,0 +1,22 @@
+// Подгружает следующую порцию комментариев без перезагрузки страницы.
+document.addEventListener("click", function (event) {
+  var link = event.target.closest("[data-comments-url]");
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  var more = link.closest(".comments-more");
+  fetch(link.dataset.commentsUrl, {credentials: "same-origin"})
+    .then(function (response) {
+      if (!response.ok) {
+        throw new Error(response.statusText);
+      }
+      return response.text();
+    })
+    .then(function (html) {
+      more.outerHTML = html;
+    })
+    .catch(function () {
+      window.location = link.href;
+    });
+});
@@ -24,14 +24,76 @@ CSRF_FAILURE_VIEW = "core.views.csrf_failure"
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+# Unsafe requests per client (user, or IP when anonymous) by URL name;
+# follows are links, so their GET requests count too.
+RATE_LIMITS = {
+    "posts:post_create": "30/m",
+    "posts:add_comment": "60/m",
+    "posts:profile_follow": "60/m",
+    "posts:profile_unfollow": "60/m",
+    "login": "20/m",
+}
+# META key with the client address set by the reverse proxy, such as
+# "HTTP_X_REAL_IP" or "HTTP_X_FORWARDED_FOR"; None uses REMOTE_ADDR.
+RATE_LIMIT_CLIENT_IP_HEADER = os.environ.get("RATE_LIMIT_CLIENT_IP_HEADER")
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, "static")]
 
+THUMBNAIL_BACKEND = "posts.thumbnails.ThumbnailBackend"
+THUMBNAIL_KVSTORE = "core.kvstores.LRUKVStore"
+
+# Directory for per-process metric snapshots; set it when running several
+# worker processes so that /metrics reports all of them.
+METRICS_DIR = os.environ.get("METRICS_DIR")
+# Bearer token required to read /metrics; unset closes the endpoint.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+# Queries slower than this are logged with their plan; None turns it off.
+SLOW_QUERY_THRESHOLD_MS = (
+    float(os.environ["SLOW_QUERY_THRESHOLD_MS"])
+    if os.environ.get("SLOW_QUERY_THRESHOLD_MS") else None
+)
+SLOW_QUERY_LOG_FILE = os.environ.get(
+    "SLOW_QUERY_LOG_FILE", os.path.join(BASE_DIR, "slow_queries.log")
+)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "slow_queries": {
+            "class": "logging.handlers.RotatingFileHandler",
+            "filename": SLOW_QUERY_LOG_FILE,
+            "maxBytes": 10 * 1024 * 1024,
+            "backupCount": 5,
+            "encoding": "utf-8",
+            "delay": True,
+        },
+    },
+    "loggers": {
+        "yatube.slow_queries": {
+            "handlers": ["slow_queries"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
+}
+
+# Set CACHE_BACKEND to a cache shared by all worker processes, e.g.
+# "django.core.cache.backends.memcached.PyLibMCCache" with CACHE_LOCATION
+# "127.0.0.1:11211", or "django.core.cache.backends.db.DatabaseCache"
+# after createcachetable. The default cache lives in each process, so
+# invalidation only reaches the process that wrote and long-lived entries
+# are cut down to core.caches.LOCAL_CACHE_MAX_TIMEOUT.
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
     }
 }
 
@@ -46,10 +108,14 @@ INSTALLED_APPS = [
     "core",
     "posts",
     "about",
+    "api",
     "sorl.thumbnail",
 ]
 
 MIDDLEWARE = [
+    "core.middleware.MetricsMiddleware",
+    "core.middleware.SlowQueryMiddleware",
+    "core.middleware.ReplicaMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -57,6 +123,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.middleware.RateLimitMiddleware",
 ]
 
 ROOT_URLCONF = "yatube.urls"
@@ -64,7 +131,7 @@ ROOT_URLCONF = "yatube.urls"
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "core.templates.TimedDjangoTemplates",
         "DIRS": [TEMPLATES_DIR],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -85,11 +152,28 @@ WSGI_APPLICATION = "yatube.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        # WAL, tuned pragmas and serialized writes, see the backend module.
+        "ENGINE": "core.backends.sqlite3",
         "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+        "CONN_MAX_AGE": 60,
     }
 }
 
+# Read replicas: comma-separated SQLite files refreshed with
+# "manage.py sync_replica". Safe requests read from them.
+for number, path in enumerate(
+    filter(None, os.environ.get("DATABASE_REPLICAS", "").split(",")), 1
+):
+    DATABASES[f"replica{number}"] = {
+        "ENGINE": "core.backends.sqlite3",
+        "NAME": path,
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["core.replicas.ReplicaRouter"]
+# Clients read from the primary for this long after they write.
+REPLICA_PIN_SECONDS = 5
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
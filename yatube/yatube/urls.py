@@ -5,13 +5,17 @@ from django.urls import include, path
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.views import metrics
+
 
 urlpatterns = [
     path("", include("posts.urls", namespace="posts")),
     path("about/", include("about.urls", namespace="about")),
+    path("api/v1/", include("api.urls", namespace="api")),
     path("auth/", include("users.urls", namespace="users")),
     path("auth/", include("django.contrib.auth.urls")),
-    path("admin/", admin.site.urls)
+    path("admin/", admin.site.urls),
+    path("metrics", metrics, name="metrics"),
 ]
 
 handler404 = "core.views.page_not_found"